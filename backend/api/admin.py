@@ -1,21 +1,51 @@
 from django.contrib import admin
+from django.db.models import Q
+
+from . import search
 from .models import User, Post, PostImage, Reaction
 
+
+class FullTextSearchMixin:
+    """Changelist search through the full-text index (api/search.py) instead of LIKE '%...%'."""
+    search_index = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(self.search_filter(search_term)), False
+
+    def search_filter(self, search_term):
+        return Q(id__in=search.matching_ids(self.search_index, search_term))
+
+
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("username", "email", "role", "is_staff", "is_active")
     list_filter = ("role", "is_staff", "is_active")
-    search_fields = ("username", "email")
+    search_fields = ("username", "first_name", "last_name", "bio")
+    search_index = "users"
+
+    def search_filter(self, search_term):
+        # Emails are not indexed (not searchable from the API); exact lookup for admins
+        condition = super().search_filter(search_term)
+        if "@" in search_term:
+            condition |= Q(email__iexact=search_term.strip())
+        return condition
 
 class PostImageInline(admin.TabularInline):
     model = PostImage
     extra = 0
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("id", "author", "created_at", "updated_at")
     list_filter = ("created_at",)
-    search_fields = ("author__username", "content")
+    search_fields = ("content",)
+    search_index = "posts"
+
+    def search_filter(self, search_term):
+        # Also posts by matching authors (was author__username)
+        return super().search_filter(search_term) | Q(author_id__in=search.matching_ids("users", search_term))
     inlines = [PostImageInline]
 
 @admin.register(Reaction)
@@ -0,0 +1,153 @@
+# backend/api/async_views.py
+"""
+Async-native versions of the read hot paths, for the ASGI app
+(school_social_aubrick/asgi.py under uvicorn):
+
+  GET /api/posts/            feed (PostViewSet.list)
+  GET /api/posts/{id}/       post detail (PostViewSet.retrieve)
+  GET /api/comments/?post=   comment threads (CommentViewSet.list)
+  GET /api/me/               current user (views.me)
+
+Under ASGI, Django runs sync views one at a time on a single thread, so the
+DRF versions make every request wait for the database work of the others.
+These run DRF's own pipeline for the same view classes (authentication,
+permissions, throttling, get_queryset(), serializers, pagination, conditional
+GET, error responses) but issue their queries through the async ORM, so the
+event loop keeps serving other requests while the database works. Serializers
+only read rows that were loaded up front (select_related / prefetch /
+annotations), never the database.
+
+Everything else at these URLs (writes, the browsable API) is handed to the
+DRF view unchanged. The routing is opt-in (settings.ASYNC_READ_VIEWS), for
+deployments that serve the ASGI app: under WSGI every request would pay for
+async_to_sync and the thread hops around it.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.response import Response
+
+from . import conditional
+from .views import CommentViewSet, PostViewSet, me as sync_me
+
+# The DRF views the router would mount at these URLs
+post_list_view = PostViewSet.as_view(
+    {"get": "list", "post": "create"}, basename="post", detail=False, suffix="List"
+)
+post_detail_view = PostViewSet.as_view(
+    {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"},
+    basename="post", detail=True, suffix="Instance",
+)
+comment_list_view = CommentViewSet.as_view(
+    {"get": "list", "post": "create"}, basename="comment", detail=False, suffix="List"
+)
+
+
+def renders_json(request):
+    return request.GET.get("format", "json") == "json" and "text/html" not in request.headers.get("Accept", "")
+
+
+async def serve(sync_view, request, read, **kwargs):
+    """
+    APIView.dispatch() for `sync_view`'s class with `await read(view, request)`
+    as the GET handler; other requests go to `sync_view` itself.
+    """
+    if request.method not in ("GET", "HEAD") or not renders_json(request):
+        return await sync_to_async(sync_view)(request, **kwargs)
+
+    view = sync_view.cls(**sync_view.initkwargs)
+    if hasattr(sync_view, "actions"):
+        # As ViewSetMixin.as_view() does (also what the Allow header lists)
+        view.action_map = {"head": sync_view.actions["get"], **sync_view.actions}
+        for method, action in view.action_map.items():
+            setattr(view, method, getattr(view, action))
+    view.args, view.kwargs = (), kwargs
+    view.headers = view.default_response_headers
+    request = view.initialize_request(request, **kwargs)
+    view.request = request
+    try:
+        # Authentication (user cache, or one query), permissions, throttles
+        await sync_to_async(view.initial)(request, **kwargs)
+        response = await read(view, request)
+    except Exception as exc:
+        response = view.handle_exception(exc)
+    return view.finalize_response(request, response, **kwargs)
+
+
+async def aget_object(view):
+    """GenericAPIView.get_object() with the async ORM."""
+    queryset = view.filter_queryset(view.get_queryset())
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    try:
+        obj = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+    except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+        raise Http404
+    view.check_object_permissions(view.request, obj)
+    return obj
+
+
+async def read_post_list(view, request):
+    paginator = view.paginator
+    queryset = view.filter_queryset(view.get_queryset())
+    if conditional.is_conditional(request):
+        window = paginator.window(queryset.prefetch_related(None), request)
+        rows = [row async for row in window.values_list(*view.version_columns())]
+        validators = view.get_validators(rows[: paginator.page_size], len(rows) > paginator.page_size)
+        response = conditional.not_modified(request, validators)
+        if response is not None:
+            return response
+
+    page = await paginator.apaginate_queryset(queryset, request, view=view)
+    response = paginator.get_paginated_response(view.get_serializer(page, many=True).data)
+    rows = [view.stamp(post) for post in page]
+    return conditional.set_validators(response, view.get_validators(rows, paginator.has_next))
+
+
+async def read_post_detail(view, request):
+    if conditional.is_conditional(request):
+        try:
+            queryset = view.get_queryset().filter(pk=view.kwargs["pk"]).prefetch_related(None)
+            rows = [row async for row in queryset.values_list(*view.version_columns())]
+        except (TypeError, ValueError):
+            rows = []
+        response = rows and conditional.not_modified(request, view.get_validators(rows))
+        if response:
+            return response
+
+    instance = await aget_object(view)
+    response = Response(view.get_serializer(instance).data)
+    return conditional.set_validators(response, view.get_validators([view.stamp(instance)]))
+
+
+async def read_comment_list(view, request):
+    queryset = view.filter_queryset(view.get_queryset())
+    page = await view.paginator.apaginate_queryset(queryset, request, view=view)
+    replies = view.reply_queryset(page)
+    view.reply_map = view.group_replies([reply async for reply in replies] if replies is not None else [])
+    return view.get_paginated_response(view.get_serializer(page, many=True).data)
+
+
+async def read_me(view, request):
+    # The user was loaded (or taken from the user cache) by authentication
+    return view.get(request)
+
+
+@csrf_exempt
+async def post_list(request):
+    return await serve(post_list_view, request, read_post_list)
+
+
+@csrf_exempt
+async def post_detail(request, pk):
+    return await serve(post_detail_view, request, read_post_detail, pk=pk)
+
+
+@csrf_exempt
+async def comment_list(request):
+    return await serve(comment_list_view, request, read_comment_list)
+
+
+@csrf_exempt
+async def me(request):
+    return await serve(sync_me, request, read_me)
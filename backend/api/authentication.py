@@ -0,0 +1,48 @@
+# backend/api/authentication.py
+"""
+JWT authentication that keeps recently seen users in a cache.
+
+simplejwt's JWTAuthentication loads the User row on every request. This
+subclass keeps the loaded user in the settings.AUTH_USER_CACHE alias
+(size-bounded, AUTH_USER_CACHE_TTL seconds) under User.cache_key(id). Every
+save that bumps User.version (profile updates, avatar/cover uploads,
+deactivation) and every delete evicts the entry (User.evict_cached), so the
+next request reloads the row. A loaded user is stored with add(), never set(),
+so a slow request cannot overwrite a fresher entry.
+
+With the default per-process LocMem cache other gunicorn workers may keep a
+stale copy until the TTL expires; point CACHE_BACKEND at a shared cache to
+make evictions global.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cache = caches[settings.AUTH_USER_CACHE]
+        key = self.user_model.cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            # Loads the row and runs simplejwt's own checks
+            user = super().get_user(validated_token)
+            cache.add(key, user)
+            return user
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
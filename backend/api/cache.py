@@ -0,0 +1,77 @@
+# backend/api/cache.py
+"""
+Serialized-fragment cache for PostSerializer.
+
+A fragment is everything PostSerializer renders for a post except the
+per-viewer `my_reaction`, which is merged in after the lookup. The cache key
+is versioned by the stamps of the rows the fragment depends on (Post.changed_at
+and counters, User.version of the author), all already loaded by the feed query, so:
+  - editing a post, uploading/processing an image, reacting or commenting
+    bumps Post.changed_at (and the counters),
+  - any profile change (avatar and its renditions, name, role) bumps User.version,
+and the next read simply misses. Stale entries age out via the TTL.
+Uses the Django cache framework (settings.CACHES, local memory by default).
+"""
+import hashlib
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .counters import REACTION_COUNTER_FIELDS
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.POST_FRAGMENT_CACHE]
+
+
+def fragment_key(post, request=None):
+    author = post.author
+    parts = [
+        # Absolute media URLs depend on the host the request came in on
+        request.build_absolute_uri("/") if request else "",
+        post.changed_at.isoformat(),
+        # changed_at has millisecond resolution on SQLite: keep the counters too
+        *(getattr(post, f) for f in REACTION_COUNTER_FIELDS),
+        post.comment_count,
+        post.root_comment_count,
+        author.pk,
+        author.version,
+    ]
+    version = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f"post:{post.pk}:{version}"
+
+
+def get_fragments(posts, render, request=None):
+    """
+    Fragments for `posts` (in order): one get_many for the page, `render(post)`
+    for misses, one set_many to store them.
+    """
+    keys = [fragment_key(post, request) for post in posts]
+    unique = dict(zip(keys, posts))
+    found = _cache().get_many(list(unique))
+    missing = {key: render(post) for key, post in unique.items() if key not in found}
+    if missing:
+        _cache().set_many(missing, settings.POST_FRAGMENT_TTL)
+        found.update(missing)
+
+    with _stats_lock:
+        _stats["hits"] += len(unique) - len(missing)
+        _stats["misses"] += len(missing)
+    return [found[key] for key in keys]
+
+
+def stats():
+    """Hit/miss counters for this process."""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else None,
+    }
@@ -0,0 +1,91 @@
+# backend/api/changes.py
+"""
+Change log behind /api/sync/: returning clients download what changed since
+their last visit instead of reloading whole pages.
+
+Writers call `record()` inside the transaction of the write, so a change is in
+the log exactly when the write is committed:
+  post     created, edited, photos added or processed; deleted -> tombstone
+  comment  created or edited; deleted -> tombstone (its replies go with it)
+  counts   a post's reaction or comment counters moved
+Rows only say *what* changed; /api/sync/ renders the current state of every
+object once, however many times it changed since the client's token.
+
+The token is the id of the last change the client has applied. Ids come from
+the database sequence, so they increase but do not commit in order: a
+transaction can commit a lower id after a higher one was already read. Reads
+therefore stop at the first missing id younger than settings.SYNC_GAP_GRACE
+seconds (an older gap is a rolled back transaction), so a token never moves
+past a change that is still in flight.
+
+`manage.py prune_changes` deletes old rows; a token from before the oldest row
+kept gets `reset` (refetch everything, then continue from the new token).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import Change
+
+Kinds = Change.Kinds
+
+
+def record(kind, *object_ids, deleted=False):
+    """Log a change to `object_ids`; call inside the transaction that makes it."""
+    Change.objects.bulk_create([Change(kind=kind, object_id=pk, deleted=deleted) for pk in object_ids])
+
+
+def _cutoff():
+    return timezone.now() - timedelta(seconds=settings.SYNC_GAP_GRACE)
+
+
+def _settled(rows, last_id, cutoff):
+    """
+    The leading part of `rows` ((id, ..., created_at) after `last_id`, by id)
+    that no transaction in flight can still slip a change in front of.
+    """
+    settled = []
+    for row in rows:
+        if row[0] != last_id + 1 and row[-1] >= cutoff:
+            break
+        settled.append(row)
+        last_id = row[0]
+    return settled
+
+
+def current():
+    """The token of the newest change a client can safely start from."""
+    cutoff = _cutoff()
+    first_recent = Change.objects.filter(created_at__gte=cutoff).aggregate(first=Min("id"))["first"]
+    if first_recent is None:
+        return Change.objects.aggregate(last=Max("id"))["last"] or 0
+    last_id = Change.objects.filter(id__lt=first_recent).aggregate(last=Max("id"))["last"] or 0
+    rows = Change.objects.filter(id__gt=last_id).order_by("id").values_list("id", "created_at")
+    settled = _settled(rows, last_id, cutoff)
+    return settled[-1][0] if settled else last_id
+
+
+def read(since, limit):
+    """
+    (rows, next token, has_more) for the changes after `since`: up to `limit`
+    (id, kind, object_id, deleted, created_at) rows. rows is None when the log
+    no longer reaches back to `since` (or never did): the client must reset.
+    """
+    bounds = Change.objects.aggregate(first=Min("id"), last=Max("id"))
+    if since > (bounds["last"] or 0) or (bounds["first"] is not None and since < bounds["first"] - 1):
+        return None, current(), False
+
+    rows = list(
+        Change.objects.filter(id__gt=since).order_by("id")
+        .values_list("id", "kind", "object_id", "deleted", "created_at")[:limit]
+    )
+    settled = _settled(rows, since, _cutoff())
+    next_token = settled[-1][0] if settled else since
+    return settled, next_token, len(settled) == limit
+
+
+def latest(rows):
+    """{(kind, object_id): deleted} keeping each object's most recent change."""
+    return {(kind, object_id): deleted for _, kind, object_id, deleted, _ in rows}
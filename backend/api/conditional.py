@@ -0,0 +1,58 @@
+# backend/api/conditional.py
+"""
+Conditional GET (ETag / Last-Modified -> 304) for the API.
+
+Validators are computed from version stamps (Post.changed_at, User.version /
+User.changed_at), never by running the serializer. When the client sends
+If-None-Match / If-Modified-Since, views read the stamps with one small indexed
+query and answer `not_modified()` before doing the real work; otherwise they
+compute the same stamps from the rows they loaded anyway and `set_validators()`
+on the full response.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+
+class Validators:
+    def __init__(self, request, *parts, last_modified=None):
+        # The full URL is part of the tag: ?fields=, ?cursor= and the host
+        # (absolute media URLs) all change the representation.
+        raw = repr((request.build_absolute_uri(), parts)).encode()
+        self.etag = f'"{hashlib.md5(raw).hexdigest()}"'
+        self.last_modified = last_modified
+
+
+def is_conditional(request):
+    return request.method in ("GET", "HEAD") and (
+        "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META
+    )
+
+
+def not_modified(request, validators):
+    """A 304 response if the client's copy is current, else None."""
+    if validators is None or request.method not in ("GET", "HEAD"):
+        return None
+    last_modified = validators.last_modified
+    response = get_conditional_response(
+        request._request if hasattr(request, "_request") else request,
+        etag=validators.etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, validators)
+    return response
+
+
+def set_validators(response, validators):
+    if validators is None or not (200 <= response.status_code < 300 or response.status_code == 304):
+        return response
+    response["ETag"] = validators.etag
+    if validators.last_modified:
+        response["Last-Modified"] = http_date(validators.last_modified.timestamp())
+    # Representations depend on the viewer (my_reaction, permissions): browsers may
+    # keep them but must revalidate, and shared caches must not serve them to others.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Authorization"])
+    return response
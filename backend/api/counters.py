@@ -0,0 +1,142 @@
+# backend/api/counters.py
+"""
+Denormalized counters on Post.
+
+Writes go through F() expressions so concurrent requests never lose an update,
+and must run inside the same transaction as the row change they mirror.
+Every counter write also bumps Post.changed_at (conditional GET validators).
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F, Q
+from django.db.models.functions import Now
+
+from .models import Comment, Post, Reaction
+
+REACTION_KEYS = [k for k, _ in Reaction.Types.choices]  # ['einstein','shakespeare','davinci','mandela']
+
+
+def reaction_field(rtype):
+    return f"{rtype}_count"
+
+
+REACTION_COUNTER_FIELDS = [reaction_field(k) for k in REACTION_KEYS]
+
+
+def reaction_changed(post_id, old_type=None, new_type=None):
+    """
+    Mirror a reaction write on the post's counters:
+      create  -> old_type=None,  new_type=<type>
+      switch  -> old_type=<old>, new_type=<new>
+      delete  -> old_type=<type>, new_type=None
+    """
+    if old_type == new_type:
+        return
+    updates = {}
+    if old_type:
+        updates[reaction_field(old_type)] = F(reaction_field(old_type)) - 1
+    if new_type:
+        updates[reaction_field(new_type)] = F(reaction_field(new_type)) + 1
+    Post.objects.filter(pk=post_id).update(**updates, changed_at=Now())
+
+
+def reaction_deltas(changes):
+    """{post_id: {type: +n/-n}} for (post_id, old_type, new_type) changes, as in reaction_changed()."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for post_id, old_type, new_type in changes:
+        if old_type == new_type:
+            continue
+        if old_type:
+            deltas[post_id][old_type] -= 1
+        if new_type:
+            deltas[post_id][new_type] += 1
+    return {post_id: {k: n for k, n in delta.items() if n} for post_id, delta in deltas.items()}
+
+
+def apply_reaction_deltas(deltas):
+    """Write reaction_deltas() output: one UPDATE per post, skipping posts whose net change is zero."""
+    for post_id, delta in deltas.items():
+        if delta:
+            updates = {reaction_field(k): F(reaction_field(k)) + n for k, n in delta.items()}
+            Post.objects.filter(pk=post_id).update(**updates, changed_at=Now())
+
+
+def reaction_counts(post):
+    """The {einstein, shakespeare, davinci, mandela, total} dict the frontend expects."""
+    counts = {k: getattr(post, reaction_field(k)) for k in REACTION_KEYS}
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+def comment_added(comment):
+    if comment.parent_id:
+        Comment.objects.filter(pk=comment.parent_id).update(reply_count=F("reply_count") + 1)
+        Post.objects.filter(pk=comment.post_id).update(comment_count=F("comment_count") + 1, changed_at=Now())
+    else:
+        Post.objects.filter(pk=comment.post_id).update(
+            comment_count=F("comment_count") + 1,
+            root_comment_count=F("root_comment_count") + 1,
+            changed_at=Now(),
+        )
+
+
+def subtree_size(comment):
+    """The comment plus every reply below it (what a CASCADE delete removes)."""
+    if comment.root_id is None:
+        return 1 + Comment.objects.filter(root_id=comment.pk).count()
+    size, frontier = 1, [comment.pk]
+    while frontier:
+        frontier = list(Comment.objects.filter(parent_id__in=frontier).values_list("id", flat=True))
+        size += len(frontier)
+    return size
+
+
+def comment_removed(comment):
+    """Call before deleting `comment`; its descendants go with it (CASCADE)."""
+    removed = subtree_size(comment)
+    if comment.parent_id:
+        Comment.objects.filter(pk=comment.parent_id).update(reply_count=F("reply_count") - 1)
+        Post.objects.filter(pk=comment.post_id).update(comment_count=F("comment_count") - removed, changed_at=Now())
+    else:
+        Post.objects.filter(pk=comment.post_id).update(
+            comment_count=F("comment_count") - removed,
+            root_comment_count=F("root_comment_count") - 1,
+            changed_at=Now(),
+        )
+
+
+def comment_counts(post):
+    return {"total": post.comment_count, "top_level": post.root_comment_count}
+
+
+def actual_reaction_counts():
+    """{post_id: {field: n}} computed from api_reaction with one GROUP BY query."""
+    actual = defaultdict(dict)
+    rows = Reaction.objects.values_list("post_id", "type").annotate(n=Count("id")).order_by()
+    for post_id, rtype, n in rows:
+        if rtype in REACTION_KEYS:
+            actual[post_id][reaction_field(rtype)] = n
+    return actual
+
+
+def actual_comment_counts():
+    """
+    ({post_id: {"comment_count": n, "root_comment_count": m}}, {comment_id: reply_count})
+    computed from api_comment with two GROUP BY queries.
+    """
+    posts = defaultdict(dict)
+    rows = (
+        Comment.objects.values_list("post_id")
+        .annotate(total=Count("id"), roots=Count("id", filter=Q(parent__isnull=True)))
+        .order_by()
+    )
+    for post_id, total, roots in rows:
+        posts[post_id] = {"comment_count": total, "root_comment_count": roots}
+
+    replies = dict(
+        Comment.objects.filter(parent__isnull=False)
+        .values_list("parent_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    return posts, replies
@@ -0,0 +1,195 @@
+# backend/api/events.py
+"""
+Live feed updates, pushed to clients as server-sent events (/api/stream/).
+
+Writers call `publish()`; the event goes out once their transaction commits:
+  post-created            {"post": id, "author": id}
+  reaction-count-changed  {"post": id, "reaction_counts": {...}}
+  comment-added           {"post": id, "comment": id, "parent": id|null, "comments_count": {...}}
+Events carry ids and counters only; clients fetch anything else they need
+(e.g. /api/posts/batch/?ids=).
+
+Every event gets an increasing id and is kept in a bounded log of
+settings.EVENTS_LOG_SIZE events. Connections read that log at their own pace
+instead of having events pushed into per-connection queues: `event_stream()`
+only asks for more once the server has sent the previous chunk, so a slow
+client costs no memory, and one that falls further behind than the log gets a
+`reset` event (refetch) rather than a gap. The same log answers `Last-Event-ID`
+when EventSource reconnects.
+
+The broker is pluggable (settings.EVENTS_BROKER):
+  - api.events.LocalBroker: in-process. Streams only see events published by
+    the same process, so serve with a single ASGI worker.
+  - api.events.CacheBroker: the log lives in the settings.EVENTS_CACHE alias and
+    connections poll it every EVENTS_POLL_INTERVAL seconds. A stand-in for a
+    real pub/sub across several processes; it needs a shared cache with an
+    atomic incr() (Redis, Memcached).
+
+Streaming needs the ASGI app (school_social_aubrick/asgi.py under uvicorn):
+under WSGI the endpoint answers 501.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# How long EventSource waits before reconnecting (ms)
+RETRY_MS = 3000
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: dict
+
+    def encode(self):
+        payload = json.dumps(self.data, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class LocalBroker:
+    def __init__(self, log_size):
+        self.log = deque(maxlen=log_size)
+        self.last_id = 0
+        self.lock = threading.Lock()
+        self.waiters = set()  # (event loop, asyncio.Event) of connections waiting for news
+
+    def publish(self, type, data):
+        with self.lock:
+            self.last_id += 1
+            self.log.append(Event(self.last_id, type, data))
+            waiters = list(self.waiters)
+        # Publishers run in request threads; wake the streams on their own loops
+        for loop, ready in waiters:
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                pass  # loop already closed
+
+    def current(self):
+        return self.last_id
+
+    def since(self, last_id):
+        """Events after `last_id`, or None if some of them already left the log."""
+        with self.lock:
+            if last_id > self.last_id:
+                return None  # an id from before a restart
+            first = self.log[0].id if self.log else self.last_id + 1
+            if last_id < first - 1:
+                return None
+            return list(islice(self.log, last_id - first + 1, None))
+
+    async def wait(self, last_id, timeout):
+        """since(last_id), waiting up to `timeout` seconds for something to arrive."""
+        ready = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), ready)
+        with self.lock:
+            self.waiters.add(waiter)
+        try:
+            events = self.since(last_id)
+            if events == []:
+                try:
+                    await asyncio.wait_for(ready.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                events = self.since(last_id)
+            return events
+        finally:
+            with self.lock:
+                self.waiters.discard(waiter)
+
+
+class CacheBroker:
+    LAST = "events:last"
+
+    def __init__(self, log_size):
+        self.log_size = log_size
+        self.cache = caches[settings.EVENTS_CACHE]
+
+    def key(self, event_id):
+        return f"events:{event_id}"
+
+    def publish(self, type, data):
+        self.cache.add(self.LAST, 0, timeout=None)
+        event_id = self.cache.incr(self.LAST)
+        self.cache.set(self.key(event_id), (type, data), timeout=None)
+        self.cache.delete(self.key(event_id - self.log_size))
+
+    def current(self):
+        return self.cache.get(self.LAST, 0)
+
+    def since(self, last_id):
+        current = self.current()
+        if last_id > current or current - last_id > self.log_size:
+            return None
+        ids = range(last_id + 1, current + 1)
+        found = self.cache.get_many([self.key(i) for i in ids])
+        events = []
+        for i in ids:
+            if self.key(i) not in found:
+                # Not written yet (publisher between incr and set) unless a later one is there
+                later = any(self.key(j) in found for j in range(i + 1, current + 1))
+                return None if later else events
+            events.append(Event(i, *found[self.key(i)]))
+        return events
+
+    async def wait(self, last_id, timeout):
+        deadline = time.monotonic() + timeout
+        since = sync_to_async(self.since, thread_sensitive=False)
+        while True:
+            events = await since(last_id)
+            remaining = deadline - time.monotonic()
+            if events != [] or remaining <= 0:
+                return events
+            await asyncio.sleep(min(settings.EVENTS_POLL_INTERVAL, remaining))
+
+
+_brokers = {}
+_brokers_lock = threading.Lock()
+
+
+def get_broker():
+    path = settings.EVENTS_BROKER
+    with _brokers_lock:
+        if path not in _brokers:
+            _brokers[path] = import_string(path)(settings.EVENTS_LOG_SIZE)
+        return _brokers[path]
+
+
+def publish(type, data):
+    """Send an event to every open stream once the current transaction commits."""
+    broker = get_broker()
+    # robust: a broker failure must not fail a request whose writes are committed
+    transaction.on_commit(lambda: broker.publish(type, data), robust=True)
+
+
+async def event_stream(broker, last_id=None):
+    """
+    The text/event-stream body: events after `last_id` (or from now on), a
+    comment line every EVENTS_HEARTBEAT seconds of silence, and a `reset` event
+    when the client missed more than the log holds.
+    """
+    yield f"retry: {RETRY_MS}\n\n"
+    current = sync_to_async(broker.current, thread_sensitive=False)
+    if last_id is None:
+        last_id = await current()
+    while True:
+        events = await broker.wait(last_id, settings.EVENTS_HEARTBEAT)
+        if events is None:
+            last_id = await current()
+            yield Event(last_id, "reset", {}).encode()
+        elif not events:
+            yield ": ping\n\n"
+        else:
+            last_id = events[-1].id
+            yield "".join(event.encode() for event in events)
@@ -0,0 +1,155 @@
+# backend/api/images.py
+"""
+Resized renditions for uploaded images (post photos, avatars, covers).
+
+Each upload is decoded once with Pillow, rotated according to its EXIF
+orientation, and re-encoded at every size in settings.IMAGE_RENDITIONS
+(never upscaled) as settings.IMAGE_RENDITION_FORMAT. Re-encoding drops all
+metadata (EXIF, GPS, comments). The result is stored on the model as
+{name: {"name": <storage path>, "width": w, "height": h}} and rendered by the
+serializers as URL maps / srcset strings; the original file is kept untouched.
+
+`encode()` is pure Pillow work (bytes in, bytes out) so api/jobs.py can run it
+in a worker process; storing the files and updating rows happens in the web
+process (`store()`, `save_post_image()`, `save_user_image()`).
+"""
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.functions import Now
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import changes
+from .models import Post, PostImage, User
+
+logger = logging.getLogger(__name__)
+
+# JSON fields holding renditions dicts (read by `manage.py gc_media`)
+RENDITION_FIELDS = [(PostImage, "renditions"), (User, "avatar_renditions"), (User, "cover_renditions")]
+
+SAVE_OPTIONS = {
+    "WEBP": {"quality": 80, "method": 4},
+    "JPEG": {"quality": 82, "optimize": True, "progressive": True},
+}
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+
+# Formats accepted as uploads, with the extension they are stored (and served) under
+UPLOAD_FORMATS = {"JPEG": "jpg", "MPO": "jpg", "PNG": "png", "GIF": "gif", "WEBP": "webp"}
+
+
+def upload_extension(file):
+    """
+    The extension `file` should be stored under if Pillow reads it as one of
+    UPLOAD_FORMATS, else None. Only parses the file (verify()), no decoding.
+    """
+    try:
+        with Image.open(file) as img:
+            fmt = img.format
+            img.verify()
+    except (OSError, SyntaxError, UnidentifiedImageError, Image.DecompressionBombError):
+        return None
+    finally:
+        file.seek(0)
+    return UPLOAD_FORMATS.get(fmt)
+
+
+def _prepare(img, fmt):
+    img = ImageOps.exif_transpose(img)
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    if fmt == "WEBP" and has_alpha:
+        return img.convert("RGBA")
+    if has_alpha:
+        # JPEG has no alpha channel: flatten onto white
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _encode(img, fmt):
+    buf = BytesIO()
+    img.save(buf, fmt, **SAVE_OPTIONS[fmt])
+    return buf.getvalue()
+
+
+def encode(data, fmt, sizes):
+    """
+    Encoded renditions of the image in `data`: {name: (bytes, width, height)}
+    for each name -> longest side in `sizes`, or None if it cannot be decoded.
+    """
+    try:
+        with Image.open(BytesIO(data)) as src:
+            base = _prepare(src, fmt)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        return None
+
+    encoded = {}
+    for name, max_side in sizes.items():
+        img = base.copy()
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+        encoded[name] = (_encode(img, fmt), img.width, img.height)
+    return encoded
+
+
+def read(field_file):
+    with field_file.open("rb"):
+        return field_file.read()
+
+
+def store(field_file, encoded):
+    """Save encode() output next to `field_file`; returns the renditions dict."""
+    if encoded is None:
+        logger.warning("Could not decode %s; serving the original only", field_file.name)
+        return {}
+    ext = EXTENSIONS[settings.IMAGE_RENDITION_FORMAT]
+    path = PurePosixPath(field_file.name)
+    renditions = {}
+    for name, (data, width, height) in encoded.items():
+        target = f"{path.parts[0]}/renditions/{path.stem}-{name}.{ext}"
+        stored = field_file.storage.save(target, ContentFile(data))
+        renditions[name] = {"name": stored, "width": width, "height": height}
+    return renditions
+
+
+def render(field_file):
+    """Generate and store every rendition of `field_file` in this process."""
+    encoded = encode(read(field_file), settings.IMAGE_RENDITION_FORMAT, settings.IMAGE_RENDITIONS)
+    return store(field_file, encoded)
+
+
+def touch_renditions(storage, renditions):
+    # Renditions reused from a twin (api/jobs.py) get a new reference: restart
+    # gc_media's grace period, as a dedupe hit does for originals
+    for rendition in renditions.values():
+        storage.touch(rendition["name"])
+
+
+def save_post_image(post_image, renditions):
+    post_image.renditions = renditions
+    post_image.status = PostImage.Status.READY if renditions else PostImage.Status.FAILED
+    with transaction.atomic():
+        post_image.save(update_fields=["renditions", "status"])
+        # The post renders differently now (versions the fragment cache and ETags, syncing clients refetch it)
+        Post.objects.filter(pk=post_image.post_id).update(changed_at=Now())
+        changes.record(changes.Kinds.POST, post_image.post_id)
+
+
+def save_user_image(user, field, renditions):
+    """field: "avatar" or "cover"."""
+    setattr(user, f"{field}_renditions", renditions)
+    # User.save bumps version/changed_at, so cached posts by this author refresh
+    user.save(update_fields=[f"{field}_renditions"])
+
+
+def process_post_image(post_image):
+    save_post_image(post_image, render(post_image.image))
+
+
+def process_user_image(user, field):
+    save_user_image(user, field, render(getattr(user, field)))
@@ -0,0 +1,161 @@
+# backend/api/jobs.py
+"""
+Background rendition generation.
+
+Upload views only store the original and return. Decoding and resizing
+(images.encode) run in a ProcessPoolExecutor of settings.IMAGE_WORKERS
+processes per web worker, so a large photo never ties up a gunicorn worker
+or holds the GIL; when the child finishes, a callback thread stores the files
+and updates the row (PostImage.status goes processing -> ready / failed).
+Until then the API serves the original and an empty renditions map.
+
+Jobs are submitted on transaction commit, so the row they update exists. A
+pool whose child died (OOM, a decoder crash) is replaced on the next submit.
+IMAGE_PROCESSING="sync" runs everything in-request instead (tests, one-off
+scripts). Jobs lost to a restart stay "processing" and are picked up by
+`manage.py generate_renditions`.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from . import images
+from .models import PostImage
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_idle = threading.Condition()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # fork: children inherit the loaded modules and only run images.encode
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS, mp_context=multiprocessing.get_context("fork")
+            )
+        return _executor
+
+
+def _drop_executor(broken):
+    """A child died (OOM, a decoder crash): the pool refuses all new work, start a fresh one next time."""
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False)
+
+
+def process_post_image(post_image):
+    # Same bytes uploaded before (content-addressed names match): reuse their renditions
+    twin = (
+        PostImage.objects.filter(image=post_image.image.name, status=PostImage.Status.READY)
+        .exclude(pk=post_image.pk)
+        .values_list("renditions", flat=True)
+        .first()
+    )
+    if twin:
+        images.touch_renditions(post_image.image.storage, twin)
+        images.save_post_image(post_image, twin)
+        return
+    if settings.IMAGE_PROCESSING == "sync":
+        images.process_post_image(post_image)
+        return
+    _submit(post_image.image, partial(_finish_post_image, post_image.pk))
+
+
+def process_user_image(user, field):
+    """field: "avatar" or "cover"."""
+    twin = (
+        get_user_model().objects.filter(**{field: getattr(user, field).name})
+        .exclude(**{f"{field}_renditions": {}})
+        .values_list(f"{field}_renditions", flat=True)
+        .first()
+    )
+    if twin:
+        images.touch_renditions(getattr(user, field).storage, twin)
+        images.save_user_image(user, field, twin)
+        return
+    if settings.IMAGE_PROCESSING == "sync":
+        images.process_user_image(user, field)
+        return
+    field_file = getattr(user, field)
+    _submit(field_file, partial(_finish_user_image, user.pk, field, field_file.name))
+
+
+def wait(timeout=None):
+    """Block until every submitted job has been stored. True unless timed out."""
+    with _idle:
+        return _idle.wait_for(lambda: _pending == 0, timeout)
+
+
+def _submit(field_file, finish):
+    fmt, sizes = settings.IMAGE_RENDITION_FORMAT, settings.IMAGE_RENDITIONS
+
+    def start():
+        global _pending
+        data = images.read(field_file)
+        for _ in range(2):
+            executor = _get_executor()
+            try:
+                future = executor.submit(images.encode, data, fmt, sizes)
+                break
+            except BrokenProcessPool:
+                logger.warning("Rendition pool is broken; starting a new one")
+                _drop_executor(executor)
+        else:
+            logger.error("No rendition pool would take %s", field_file.name)
+            finish(None)  # no renditions (status "failed"); `generate_renditions --all` redoes it
+            return
+        with _idle:
+            _pending += 1
+        submitter = threading.get_ident()
+        future.add_done_callback(partial(_done, finish=finish, submitter=submitter))
+
+    # The upload is committed either way: a failure here must not turn its response into a 500
+    transaction.on_commit(start, robust=True)
+
+
+def _done(future, finish, submitter):
+    global _pending
+    try:
+        try:
+            encoded = future.result()
+        except Exception:
+            logger.exception("Rendition job failed")
+            encoded = None
+        finish(encoded)
+    except Exception:
+        logger.exception("Could not store renditions")
+    finally:
+        if threading.get_ident() != submitter:
+            # Callbacks normally run on the executor's thread, which has its own connection
+            connection.close()
+        with _idle:
+            _pending -= 1
+            _idle.notify_all()
+
+
+def _finish_post_image(pk, encoded):
+    post_image = PostImage.objects.filter(pk=pk).first()
+    if post_image is None:
+        return  # deleted while processing
+    images.save_post_image(post_image, images.store(post_image.image, encoded))
+
+
+def _finish_user_image(pk, field, name, encoded):
+    user = get_user_model().objects.filter(pk=pk).first()
+    if user is None or getattr(user, field).name != name:
+        return  # deleted or replaced by a newer upload while processing
+    images.save_user_image(user, field, images.store(getattr(user, field), encoded))
@@ -0,0 +1,93 @@
+# backend/api/management/commands/bench_reads.py
+import http.client
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ["/api/posts/", "/api/me/"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent read throughput of a running server, e.g. the WSGI setup "
+        "(gunicorn school_social_aubrick.wsgi:application) against the ASGI one "
+        "(gunicorn school_social_aubrick.asgi:application -k uvicorn.workers.UvicornWorker)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server base URL.")
+        parser.add_argument(
+            "--path", action="append", dest="paths",
+            help=f"Path to request, repeatable; cycled per request (default: {' '.join(DEFAULT_PATHS)}).",
+        )
+        parser.add_argument("--concurrency", type=int, default=32, help="Simultaneous clients.")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+        parser.add_argument("--username", help="Log in as this user to get a token.")
+        parser.add_argument("--password")
+        parser.add_argument("--token", help="Access token to send instead of logging in.")
+
+    def handle(self, *args, url, paths, concurrency, duration, username, password, token, **options):
+        target = urlsplit(url)
+        paths = paths or DEFAULT_PATHS
+        if token is None and username:
+            token = self.login(target, username, password or "")
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+        deadline = time.monotonic() + duration
+        latencies, statuses = [], {}
+        lock = threading.Lock()
+
+        def client(n):
+            conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=60)
+            mine, codes, i = [], {}, n
+            while time.monotonic() < deadline:
+                path = paths[i % len(paths)]
+                i += 1
+                started = time.perf_counter()
+                try:
+                    conn.request("GET", path, headers=headers)
+                    response = conn.getresponse()
+                    response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    status = "error"
+                mine.append(time.perf_counter() - started)
+                codes[status] = codes.get(status, 0) + 1
+            conn.close()
+            with lock:
+                latencies.extend(mine)
+                for status, count in codes.items():
+                    statuses[status] = statuses.get(status, 0) + count
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(client, range(concurrency)))
+        elapsed = time.monotonic() - started
+
+        if not latencies:
+            raise CommandError("No request completed.")
+        latencies.sort()
+        ms = [v * 1000 for v in latencies]
+        self.stdout.write(f"{len(latencies)} requests in {elapsed:.1f}s with {concurrency} clients: "
+                          f"{len(latencies) / elapsed:.1f} req/s")
+        self.stdout.write(
+            f"latency ms: p50 {statistics.median(ms):.1f}  p95 {ms[int(len(ms) * 0.95) - 1]:.1f}  "
+            f"p99 {ms[int(len(ms) * 0.99) - 1]:.1f}  max {ms[-1]:.1f}"
+        )
+        self.stdout.write("status: " + ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items(), key=str)))
+
+    def login(self, target, username, password):
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        body = json.dumps({"username": username, "password": password})
+        conn.request("POST", "/api/auth/token/", body=body, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        data = response.read()
+        if response.status != 200:
+            raise CommandError(f"Login failed ({response.status}): {data[:200]!r}")
+        return json.loads(data)["access"]
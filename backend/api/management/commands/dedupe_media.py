@@ -0,0 +1,57 @@
+# backend/api/management/commands/dedupe_media.py
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Now
+
+from api.models import Post, PostImage
+from api.storage import content_addressed_storage, content_digest
+
+
+class Command(BaseCommand):
+    help = (
+        "Move media uploaded before content-addressed storage to hash-based names, "
+        "pointing duplicate rows at a single copy. The old files are left for `gc_media`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would move.")
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, dry_run=False, batch_size=100, **options):
+        storage = content_addressed_storage
+        moved = 0
+        blobs = set()
+
+        for model, field in storage.reference_fields:
+            rows = model._default_manager.exclude(**{f"{field}__isnull": True}).exclude(**{field: ""}).order_by("pk")
+            for obj in rows.iterator(chunk_size=batch_size):
+                old = getattr(obj, field).name
+                if content_digest(old):
+                    blobs.add(old)
+                    continue
+                if not storage.exists(old):
+                    self.stderr.write(f"{model.__name__} #{obj.pk} {field}: {old} is missing, skipped")
+                    continue
+
+                if dry_run:
+                    new = old
+                else:
+                    with storage.open(old) as f:
+                        new = storage.save(old, f)
+                    self._repoint(obj, field, new)
+                blobs.add(new)
+                moved += 1
+                if options["verbosity"] >= 2:
+                    self.stdout.write(f"{model.__name__} #{obj.pk} {field}: {old} -> {new}")
+
+        verb = "would move" if dry_run else "moved"
+        summary = f"{moved} file reference(s) {verb}"
+        if not dry_run:
+            summary += f"; {len(blobs)} unique blob(s) in use"
+        self.stdout.write(self.style.SUCCESS(summary + "."))
+
+    def _repoint(self, obj, field, name):
+        setattr(obj, field, name)
+        # save() so User.version bumps / the post's changed_at moves: URLs changed
+        obj.save(update_fields=[field])
+        if isinstance(obj, PostImage):
+            Post.objects.filter(pk=obj.post_id).update(changed_at=Now())
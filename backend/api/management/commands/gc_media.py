@@ -0,0 +1,134 @@
+# backend/api/management/commands/gc_media.py
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.images import RENDITION_FIELDS
+from api.storage import content_addressed_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete media files no row references any more (deleted posts, replaced avatars/covers, "
+        "superseded renditions)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "dirs", nargs="*",
+            help="Directories under MEDIA_ROOT to sweep (default: the upload_to of every media field "
+                 "and the upload staging directory).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only report orphans.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--min-age", type=int, default=3600,
+            help="Seconds a file must be untouched before it can go (uploads/jobs still in flight).",
+        )
+
+    def handle(self, *args, dirs=(), dry_run=False, batch_size=1000, min_age=3600, **options):
+        storage = content_addressed_storage
+        referenced = self.referenced_names(batch_size)
+        dirs = dirs or sorted(
+            {model._meta.get_field(field).upload_to.strip("/") for model, field in storage.reference_fields}
+            # Spill files of requests killed before they were moved into place (api/uploads.py)
+            | {os.path.relpath(storage.staging_dir, storage.location)}
+        )
+        cutoff = time.time() - min_age
+        self.roots = {os.path.join(storage.location, d) for d in dirs}
+        self.orphans = self.freed = 0
+
+        scanned = 0
+        batch = []
+        for name, entry in self.walk(storage.location, dirs):
+            scanned += 1
+            if name in referenced:
+                continue
+            stat = entry.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            batch.append((name, entry.path, stat.st_size))
+            if len(batch) >= batch_size:
+                self.collect(batch, cutoff, dry_run, options["verbosity"])
+                batch = []
+        self.collect(batch, cutoff, dry_run, options["verbosity"])
+
+        verb = "would delete" if dry_run else "deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} file(s), {len(referenced)} referenced; "
+            f"{verb} {self.orphans} orphan(s), {self.freed / 1024 / 1024:.1f} MB."
+        ))
+
+    def referenced_names(self, batch_size):
+        """Every file name a row points at: one streaming query per field."""
+        names = set()
+        for model, field in content_addressed_storage.reference_fields:
+            rows = model._default_manager.exclude(**{f"{field}__isnull": True}).values_list(field, flat=True)
+            names.update(name for name in rows.iterator(chunk_size=batch_size) if name)
+        for model, field in RENDITION_FIELDS:
+            rows = model._default_manager.exclude(**{field: {}}).values_list(field, flat=True)
+            for renditions in rows.iterator(chunk_size=batch_size):
+                names.update(r["name"] for r in renditions.values())
+        return names
+
+    def still_referenced(self, names):
+        """The `names` a file field points at right now."""
+        found = set()
+        for model, field in content_addressed_storage.reference_fields:
+            found.update(model._default_manager.filter(**{f"{field}__in": names}).values_list(field, flat=True))
+        return found
+
+    def collect(self, batch, cutoff, dry_run, verbosity):
+        """
+        Delete the (name, path, size) candidates in `batch` that are still orphans.
+        The referenced_names() snapshot may be minutes old by now: an upload can
+        have deduped onto a candidate since (which also touches it, see
+        api/storage.py), so both the rows and the mtime are checked again.
+        """
+        if not batch:
+            return
+        live = self.still_referenced([name for name, _, _ in batch])
+        paths = []
+        for name, path, size in batch:
+            if name in live:
+                continue
+            try:
+                if os.stat(path).st_mtime > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            self.orphans += 1
+            self.freed += size
+            if verbosity >= 2:
+                self.stdout.write(name)
+            paths.append(path)
+        self.delete(paths, dry_run)
+
+    def walk(self, root, dirs):
+        """(name relative to MEDIA_ROOT, DirEntry) for every file under `dirs`."""
+        stack = [d for d in dirs if os.path.isdir(os.path.join(root, d))]
+        while stack:
+            rel = stack.pop()
+            with os.scandir(os.path.join(root, rel)) as it:
+                for entry in it:
+                    name = f"{rel}/{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(name)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield name, entry
+
+    def delete(self, paths, dry_run):
+        if dry_run or not paths:
+            return
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        # Drop shard directories left empty (posts/3f/ ...)
+        for directory in {os.path.dirname(p) for p in paths} - self.roots:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
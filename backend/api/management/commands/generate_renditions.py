@@ -0,0 +1,42 @@
+# backend/api/management/commands/generate_renditions.py
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.images import process_post_image, process_user_image
+from api.models import PostImage
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate resized renditions in this process for post images still marked processing "
+        "(e.g. jobs lost to a restart) and avatars/covers that have none."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Regenerate existing renditions too.")
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, all=False, batch_size=100, **options):
+        images = PostImage.objects.order_by("id")
+        if not all:
+            images = images.filter(status=PostImage.Status.PROCESSING)
+        done = 0
+        for img in images.iterator(chunk_size=batch_size):
+            process_post_image(img)
+            done += 1
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"PostImage #{img.id}: {img.status} {sorted(img.renditions)}")
+
+        for field in ("avatar", "cover"):
+            users = User.objects.exclude(**{f"{field}__isnull": True}).exclude(**{field: ""}).order_by("id")
+            if not all:
+                users = users.filter(**{f"{field}_renditions": {}})
+            for user in users.iterator(chunk_size=batch_size):
+                process_user_image(user, field)
+                done += 1
+                if options["verbosity"] >= 2:
+                    self.stdout.write(f"User #{user.id} {field}: {sorted(getattr(user, f'{field}_renditions'))}")
+
+        self.stdout.write(self.style.SUCCESS(f"{done} image(s) processed."))
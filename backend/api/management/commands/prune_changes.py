@@ -0,0 +1,35 @@
+# backend/api/management/commands/prune_changes.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from api.models import Change
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete change log rows (api/changes.py) older than --days. Clients whose /api/sync/ token "
+        "is older than what is left get `reset` and reload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=float, default=settings.SYNC_RETENTION_DAYS,
+            help=f"Days of changes to keep (default: settings.SYNC_RETENTION_DAYS, {settings.SYNC_RETENTION_DAYS}).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only count the rows to delete.")
+
+    def handle(self, *args, days, dry_run=False, **options):
+        cutoff = timezone.now() - timedelta(days=days)
+        # The newest row always stays: it is what tells a current token from a stale one
+        last = Change.objects.aggregate(last=Max("id"))["last"]
+        old = Change.objects.filter(created_at__lt=cutoff, id__lt=last or 0)
+        if dry_run:
+            count = old.count()
+        else:
+            count, _ = old.delete()
+        verb = "would delete" if dry_run else "deleted"
+        self.stdout.write(self.style.SUCCESS(f"{count} change(s) older than {days:g} day(s) ({verb})."))
@@ -0,0 +1,73 @@
+# backend/api/management/commands/reconcile_comment_counts.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api import changes
+from api.counters import actual_comment_counts
+from api.models import Comment, Post
+
+POST_FIELDS = ["comment_count", "root_comment_count"]
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized comment counters (Post totals, Comment.reply_count) from api_comment."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report drifted rows.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, dry_run=False, batch_size=500, **options):
+        post_counts, reply_counts = actual_comment_counts()
+
+        stale_posts = self._reconcile(
+            Post.objects.only("id", *POST_FIELDS),
+            POST_FIELDS,
+            lambda post: post_counts.get(post.id, {}),
+            dry_run, batch_size, options["verbosity"],
+        )
+        stale_comments = self._reconcile(
+            Comment.objects.only("id", "reply_count"),
+            ["reply_count"],
+            lambda comment: {"reply_count": reply_counts.get(comment.id, 0)},
+            dry_run, batch_size, options["verbosity"],
+        )
+
+        verb = "would fix" if dry_run else "fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{stale_posts} post(s) and {stale_comments} comment(s) with drifted comment counters ({verb})."
+        ))
+
+    def _reconcile(self, queryset, fields, expected_for, dry_run, batch_size, verbosity):
+        model = queryset.model
+        fixed = []
+        stale = 0
+        for obj in queryset.order_by("id").iterator(chunk_size=batch_size):
+            expected = expected_for(obj)
+            drift = {f: expected.get(f, 0) for f in fields if getattr(obj, f) != expected.get(f, 0)}
+            if not drift:
+                continue
+            stale += 1
+            if verbosity >= 2:
+                self.stdout.write(f"{model.__name__} #{obj.id}: {drift}")
+            for f, value in drift.items():
+                setattr(obj, f, value)
+            fixed.append(obj)
+            if not dry_run and len(fixed) >= batch_size:
+                self._save(model, fixed, fields)
+                fixed = []
+
+        if not dry_run and fixed:
+            self._save(model, fixed, fields)
+        return stale
+
+    def _save(self, model, objs, fields):
+        if model is Post:
+            now = timezone.now()
+            for post in objs:
+                post.changed_at = now  # the conditional GET stamp (see api/counters.py)
+            fields = [*fields, "changed_at"]
+        with transaction.atomic():
+            model.objects.bulk_update(objs, fields)
+            kind = changes.Kinds.COUNTS if model is Post else changes.Kinds.COMMENT
+            changes.record(kind, *[obj.id for obj in objs])
@@ -0,0 +1,55 @@
+# backend/api/management/commands/reconcile_reaction_counts.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api import changes
+from api.counters import REACTION_COUNTER_FIELDS, actual_reaction_counts
+from api.models import Post
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized per-post reaction counters from api_reaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report drifted posts.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, dry_run=False, batch_size=500, **options):
+        actual = actual_reaction_counts()
+        fixed = []
+        stale = 0
+
+        posts = Post.objects.only("id", *REACTION_COUNTER_FIELDS).order_by("id")
+        for post in posts.iterator(chunk_size=batch_size):
+            expected = actual.get(post.id, {})
+            drift = {
+                f: expected.get(f, 0)
+                for f in REACTION_COUNTER_FIELDS
+                if getattr(post, f) != expected.get(f, 0)
+            }
+            if not drift:
+                continue
+            stale += 1
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"Post #{post.id}: {drift}")
+            for f, value in drift.items():
+                setattr(post, f, value)
+            fixed.append(post)
+            if not dry_run and len(fixed) >= batch_size:
+                self._save(fixed)
+                fixed = []
+
+        if not dry_run and fixed:
+            self._save(fixed)
+
+        verb = "would fix" if dry_run else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{stale} post(s) with drifted reaction counters ({verb})."))
+
+    def _save(self, posts):
+        now = timezone.now()
+        for post in posts:
+            post.changed_at = now  # the conditional GET stamp (see api/counters.py)
+        with transaction.atomic():
+            Post.objects.bulk_update(posts, [*REACTION_COUNTER_FIELDS, "changed_at"])
+            changes.record(changes.Kinds.COUNTS, *[post.id for post in posts])
@@ -0,0 +1,150 @@
+# backend/api/media.py
+"""
+Serving MEDIA_ROOT (uploads and renditions).
+
+Replaces django.conf.urls.static.static(), which is DEBUG-only and reads files
+through Python. Here:
+  - full responses are FileResponse objects over the open file, which gunicorn
+    hands to os.sendfile (wsgi.file_wrapper), so workers are not busy copying,
+  - single byte ranges (Range / If-Range) get 206 through the same path,
+  - strong ETags and Last-Modified answer If-None-Match / If-Modified-Since with 304,
+  - content-addressed names (api/storage.py) never change content, so they are
+    cached for a year as immutable; legacy names get settings.MEDIA_CACHE_MAX_AGE,
+  - files are served from the API's origin, so only INLINE_TYPES (raster images)
+    are displayed; anything else (an .html or .svg that predates upload
+    validation, say) is a sandboxed octet-stream download.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+from .storage import content_digest
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Never image/svg+xml: it can carry scripts
+INLINE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+SANDBOX = "default-src 'none'; sandbox"
+
+
+class FileRange:
+    """
+    `length` bytes of `file` from `start`. Keeps fileno() so gunicorn still uses
+    sendfile (bounded by Content-Length); read() stops at the end of the range
+    for servers that iterate instead.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable range, "invalid" if unsatisfiable, None to ignore."""
+    match = RANGE.match(header.replace(" ", ""))
+    if not match or match.group(1) == match.group(2) == "":
+        return None  # malformed or multiple ranges: serve the whole file
+    first, last = match.groups()
+    if first == "":
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return "invalid"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "invalid"
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    value = request.META.get("HTTP_IF_RANGE")
+    if value is None:
+        return True
+    if value.startswith('"'):
+        return value == etag
+    since = parse_http_date_safe(value)
+    return since is not None and int(mtime) <= since
+
+
+def serve(request, path):
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404("Not found")
+    if not os.path.isfile(fullpath) or os.path.basename(path).startswith("."):
+        raise Http404("Not found")
+
+    digest = content_digest(path)
+    etag = f'"{digest}"' if digest else f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = file_response(request, fullpath, stat.st_size, etag, stat.st_mtime)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["X-Content-Type-Options"] = "nosniff"
+    response["Content-Security-Policy"] = SANDBOX
+    if digest:
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def file_response(request, fullpath, size, etag, mtime):
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    inline = content_type in INLINE_TYPES and not encoding
+    if not inline:
+        content_type = "application/octet-stream"
+
+    span = None
+    if "HTTP_RANGE" in request.META and if_range_matches(request, etag, mtime):
+        span = parse_range(request.META["HTTP_RANGE"], size)
+    if span == "invalid":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    start, end = span or (0, size - 1)
+    length = end - start + 1 if size else 0
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type)
+    elif span:
+        response = FileResponse(FileRange(open(fullpath, "rb"), start, length), content_type=content_type)
+    else:
+        response = FileResponse(open(fullpath, "rb"), content_type=content_type)
+
+    if span:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if not inline:
+        response["Content-Disposition"] = "attachment"
+    response["Content-Length"] = str(length)
+    response["Accept-Ranges"] = "bytes"
+    return response
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:01
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_reaction_counts(apps, schema_editor):
+    Post = apps.get_model("api", "Post")
+    Reaction = apps.get_model("api", "Reaction")
+    rows = Reaction.objects.values_list("post_id", "type").annotate(n=Count("id")).order_by()
+    for post_id, rtype, n in rows:
+        Post.objects.filter(pk=post_id).update(**{f"{rtype}_count": n})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_post_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="davinci_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="einstein_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="mandela_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="shakespeare_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_reaction_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_post_reaction_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reaction",
+            index=models.Index(fields=["post", "-id"], name="reaction_post_recent_idx"),
+        ),
+    ]
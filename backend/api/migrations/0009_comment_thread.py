@@ -0,0 +1,50 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_threads(apps, schema_editor):
+    Comment = apps.get_model("api", "Comment")
+    parents = dict(Comment.objects.values_list("id", "parent_id"))
+
+    def walk(cid):
+        depth, root = 0, cid
+        while parents.get(root):
+            root = parents[root]
+            depth += 1
+        return root, depth
+
+    replies = []
+    for cid, parent_id in parents.items():
+        if parent_id:
+            root, depth = walk(cid)
+            replies.append(Comment(id=cid, root_id=root, depth=depth))
+    Comment.objects.bulk_update(replies, ["root", "depth"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_reaction_post_recent_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="root",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="thread",
+                to="api.comment",
+            ),
+        ),
+        migrations.RunPython(backfill_threads, migrations.RunPython.noop),
+    ]
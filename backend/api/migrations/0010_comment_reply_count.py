@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:06
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_reply_count(apps, schema_editor):
+    Comment = apps.get_model("api", "Comment")
+    rows = (
+        Comment.objects.filter(parent__isnull=False)
+        .values_list("parent_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for parent_id, n in rows:
+        Comment.objects.filter(pk=parent_id).update(reply_count=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_comment_thread"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="reply_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_reply_count, migrations.RunPython.noop),
+    ]
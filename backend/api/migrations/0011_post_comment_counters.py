@@ -0,0 +1,37 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:08
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_comment_counts(apps, schema_editor):
+    Post = apps.get_model("api", "Post")
+    Comment = apps.get_model("api", "Comment")
+    rows = (
+        Comment.objects.values_list("post_id")
+        .annotate(total=Count("id"), roots=Count("id", filter=Q(parent__isnull=True)))
+        .order_by()
+    )
+    for post_id, total, roots in rows:
+        Post.objects.filter(pk=post_id).update(comment_count=total, root_comment_count=roots)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_comment_reply_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="root_comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_comment_counts, migrations.RunPython.noop),
+    ]
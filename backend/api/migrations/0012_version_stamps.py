@@ -0,0 +1,36 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:13
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_post_changed_at(apps, schema_editor):
+    Post = apps.get_model("api", "Post")
+    Post.objects.update(changed_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_post_comment_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="changed_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="changed_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_post_changed_at, migrations.RunPython.noop),
+    ]
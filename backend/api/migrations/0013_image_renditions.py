@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_version_stamps"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="postimage",
+            name="renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="avatar_renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="cover_renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:20
+
+from django.db import migrations, models
+
+
+def backfill_status(apps, schema_editor):
+    # Images processed before the job runner already have their renditions;
+    # the rest stay "processing" for `manage.py generate_renditions`.
+    PostImage = apps.get_model("api", "PostImage")
+    PostImage.objects.exclude(renditions={}).update(status="ready")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_image_renditions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="postimage",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("processing", "Processing"),
+                    ("ready", "Ready"),
+                    ("failed", "Failed"),
+                ],
+                default="processing",
+                max_length=10,
+            ),
+        ),
+        migrations.RunPython(backfill_status, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:23
+
+import api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_post_image_status"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="postimage",
+            name="image",
+            field=models.ImageField(
+                storage=api.storage.media_storage, upload_to="posts/"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="avatar",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=api.storage.media_storage,
+                upload_to="avatars/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="cover",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=api.storage.media_storage,
+                upload_to="covers/",
+            ),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:32
+
+from django.db import migrations
+
+# Full-text index for api/search.py. The database keeps it in sync: FTS5
+# external-content tables + triggers on SQLite, generated tsvector columns
+# + GIN indexes on PostgreSQL. Other databases get no index (icontains fallback).
+
+FTS_OPTIONS = "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+
+SQLITE_TABLES = [
+    # (fts table, source table, indexed columns)
+    ("api_post_fts", "api_post", ["content"]),
+    ("api_user_fts", "api_user", ["username", "first_name", "last_name", "bio"]),
+]
+
+POSTGRES_VECTORS = [
+    (
+        "api_post",
+        "to_tsvector('simple', coalesce(content, ''))",
+    ),
+    (
+        "api_user",
+        "setweight(to_tsvector('simple', coalesce(username, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(bio, '')), 'D')",
+    ),
+]
+
+
+def sqlite_statements(fts, source, columns):
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{source}', content_rowid='id', {FTS_OPTIONS})",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for fts, source, columns in SQLITE_TABLES:
+            for sql in sqlite_statements(fts, source, columns):
+                schema_editor.execute(sql)
+    elif vendor == "postgresql":
+        for table, vector in POSTGRES_VECTORS:
+            schema_editor.execute(
+                f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED"
+            )
+            schema_editor.execute(
+                f"CREATE INDEX {table}_search_idx ON {table} USING GIN (search_vector)"
+            )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for fts, _, _ in SQLITE_TABLES:
+            for suffix in ("ai", "ad", "au"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+    elif vendor == "postgresql":
+        for table, _ in POSTGRES_VECTORS:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_search_idx")
+            schema_editor.execute(
+                f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector"
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_content_addressed_media"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.0.7 on 2026-10-18 02:10
+
+import importlib
+
+from django.db import migrations
+
+# PostgreSQL only: fold accents in the search index like SQLite's FTS5
+# (remove_diacritics) does, so "jose" finds "José" and the reverse. unaccent()
+# is only STABLE (its dictionary can change), which a generated column does not
+# accept; immutable_unaccent() pins the dictionary and is declared IMMUTABLE.
+# api/search.py wraps the tsquery input in the same function.
+
+UNACCENT_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+    "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+)
+
+POSTGRES_VECTORS = [
+    (
+        "api_post",
+        "to_tsvector('simple', immutable_unaccent(coalesce(content, '')))",
+    ),
+    (
+        "api_user",
+        "setweight(to_tsvector('simple', immutable_unaccent(coalesce(username, ''))), 'A') || "
+        "setweight(to_tsvector('simple', immutable_unaccent(coalesce(first_name, '') || ' ' || "
+        "coalesce(last_name, ''))), 'B') || "
+        "setweight(to_tsvector('simple', immutable_unaccent(coalesce(bio, ''))), 'D')",
+    ),
+]
+
+
+def rebuild(schema_editor, vectors):
+    for table, vector in vectors:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_search_idx")
+        schema_editor.execute(
+            f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector"
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {table}_search_idx ON {table} USING GIN (search_vector)"
+        )
+
+
+def add_unaccent(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    schema_editor.execute(UNACCENT_FUNCTION)
+    rebuild(schema_editor, POSTGRES_VECTORS)
+
+
+def remove_unaccent(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    previous = importlib.import_module("api.migrations.0016_search_index")
+    rebuild(schema_editor, previous.POSTGRES_VECTORS)
+    schema_editor.execute("DROP FUNCTION IF EXISTS immutable_unaccent(text)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0018_change_log"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_unaccent, remove_unaccent),
+    ]
@@ -1,6 +1,12 @@
 # Create your models here.
-from django.db import models
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
+
+from .storage import media_storage
 
 
 
@@ -11,11 +17,58 @@ class User(AbstractUser):
         PARENT  = 'parent',  'Parent'
 
     role = models.CharField(max_length=10, choices=Roles.choices, default=Roles.STUDENT)
-    avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    # Uploads are named by content hash and stored once (api/storage.py)
+    avatar = models.ImageField(upload_to='avatars/', storage=media_storage, blank=True, null=True)
 
     # NEW
     bio = models.TextField(blank=True, default="")
-    cover = models.ImageField(upload_to='covers/', blank=True, null=True)
+    cover = models.ImageField(upload_to='covers/', storage=media_storage, blank=True, null=True)
+    # Resized copies of avatar/cover, {name: {"name", "width", "height"}} (api/images.py)
+    avatar_renditions = models.JSONField(default=dict, blank=True)
+    cover_renditions = models.JSONField(default=dict, blank=True)
+
+    # Version stamp of the public profile, bumped on every save except a bare
+    # last_login update. Drives ETag/Last-Modified (api/conditional.py).
+    version = models.PositiveIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # User directory (UserViewSet.list): case-insensitive prefix ranges and
+            # keyset pagination on (lower(username), id), optionally within a role
+            models.Index(Lower('username'), models.F('id'), name='user_username_ci_idx'),
+            models.Index(models.F('role'), Lower('username'), models.F('id'), name='user_role_username_ci_idx'),
+            models.Index(Lower('first_name'), name='user_first_name_ci_idx'),
+            models.Index(Lower('last_name'), name='user_last_name_ci_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        bump = update_fields is None or set(update_fields) - {"last_login"}
+        if bump:
+            self.version += 1
+            self.changed_at = timezone.now()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version", "changed_at"}
+        super().save(*args, **kwargs)
+        if bump:
+            self.evict_cached()
+
+    def delete(self, *args, **kwargs):
+        self.evict_cached()
+        return super().delete(*args, **kwargs)
+
+    @staticmethod
+    def cache_key(user_id):
+        """Key of the user in the authentication cache (api/authentication.py)."""
+        return f"auth:user:{user_id}"
+
+    def evict_cached(self):
+        # Now, and again once committed: a request that read the old row before
+        # the commit may have cached it in between.
+        key, cache = self.cache_key(self.pk), caches[settings.AUTH_USER_CACHE]
+        cache.delete(key)
+        transaction.on_commit(lambda: cache.delete(key))
 
     def __str__(self):
         return f"{self.username} ({self.role})"
@@ -26,17 +79,46 @@ class Post(models.Model):
     content = models.TextField(max_length=2000, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Last change to anything the post renders (edits, images, counters);
+    # api.counters bumps it alongside the counters. Drives ETag/Last-Modified.
+    changed_at = models.DateTimeField(auto_now=True)
+
+    # Denormalized reaction counters, one per Reaction.Types value.
+    # Maintained by api.counters on react/unreact; rebuilt by `manage.py reconcile_reaction_counts`.
+    einstein_count = models.PositiveIntegerField(default=0)
+    shakespeare_count = models.PositiveIntegerField(default=0)
+    davinci_count = models.PositiveIntegerField(default=0)
+    mandela_count = models.PositiveIntegerField(default=0)
+
+    # Denormalized comment counters (all comments / top-level only).
+    # Maintained by api.counters on comment create/delete; rebuilt by `manage.py reconcile_comment_counts`.
+    comment_count = models.PositiveIntegerField(default=0)
+    root_comment_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination for the feed and profile pages (see api/pagination.py)
+            models.Index(fields=['-created_at', '-id'], name='post_feed_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='post_author_feed_idx'),
+        ]
 
     def __str__(self):
         return f"Post #{self.pk} by {self.author.username}"
 
 
 class PostImage(models.Model):
+    class Status(models.TextChoices):
+        PROCESSING = 'processing', 'Processing'
+        READY = 'ready', 'Ready'
+        FAILED = 'failed', 'Failed'
+
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='images')
-    image = models.ImageField(upload_to='posts/')
+    image = models.ImageField(upload_to='posts/', storage=media_storage)
+    # Resized copies, {name: {"name", "width", "height"}} (api/images.py),
+    # generated in the background (api/jobs.py); `status` tracks that job.
+    renditions = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PROCESSING)
 
     def __str__(self):
         return f"PostImage #{self.pk} for Post #{self.post_id}"
@@ -46,12 +128,28 @@ class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
     parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.CASCADE, related_name="replies")
+    # Thread bookkeeping so a whole tree loads with one `root_id IN (...)` query.
+    # Roots have root=None and depth=0; set automatically in save().
+    root = models.ForeignKey("self", null=True, blank=True, on_delete=models.CASCADE, related_name="thread")
+    depth = models.PositiveSmallIntegerField(default=0)
+    # Direct replies; maintained by api.counters so threads can report "N more replies"
+    reply_count = models.PositiveIntegerField(default=0)
     content = models.TextField(max_length=2000)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["created_at"]  # oldest first inside threads
 
+    def save(self, *args, **kwargs):
+        if self.parent_id and self._state.adding:
+            self.root_id = self.parent.root_id or self.parent_id
+            self.depth = self.parent.depth + 1
+        super().save(*args, **kwargs)
+
+    @property
+    def thread_id(self):
+        return self.root_id or self.pk
+
     def __str__(self):
         return f"Comment #{self.pk} by {self.author.username} on Post #{self.post_id}"
 
@@ -73,11 +171,35 @@ class Reaction(models.Model):
         indexes = [
             models.Index(fields=['post', 'type']),
             models.Index(fields=['user', 'post']),
+            models.Index(fields=['post', '-id'], name='reaction_post_recent_idx'),
         ]
 
     def __str__(self):
         return f"{self.user.username} {self.type} Post #{self.post_id}"
 
 
+class Change(models.Model):
+    """
+    Append-only change log read by /api/sync/ (api/changes.py). Written in the
+    same transaction as the change it records; the id is the sync token.
+    """
+    class Kinds(models.TextChoices):
+        POST = 'post', 'Post'
+        COMMENT = 'comment', 'Comment'
+        COUNTS = 'counts', 'Post counters'
+
+    kind = models.CharField(max_length=10, choices=Kinds.choices)
+    object_id = models.PositiveBigIntegerField()
+    # Tombstone: the object was deleted
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Transactions still in flight (api.changes.current) and pruning
+            models.Index(fields=['created_at'], name='change_created_idx'),
+        ]
 
+    def __str__(self):
+        return f"Change #{self.pk}: {self.kind} #{self.object_id}{' deleted' if self.deleted else ''}"
@@ -0,0 +1,196 @@
+# backend/api/pagination.py
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset ("seek") pagination.
+
+    Pages are ordered on a unique tuple of columns (e.g. created_at, id) and
+    the next page is fetched with `WHERE (created_at, id) < (last_created_at, last_id)`
+    instead of `OFFSET n`, so every page costs the same index range scan no
+    matter how deep the client scrolls. No COUNT(*) query is ever issued.
+
+    The cursor is an opaque urlsafe-base64 token holding the position of the
+    last row on the page.
+    """
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 50
+    # All fields must sort in the same direction; the last one must be unique.
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    @property
+    def fields(self):
+        return [f.lstrip("-") for f in self.ordering]
+
+    @property
+    def descending(self):
+        return self.ordering[0].startswith("-")
+
+    def window(self, queryset, request):
+        """
+        The (unevaluated) slice of `queryset` for the requested page, plus one
+        extra row to know whether there is a following page.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+        return queryset[: self.page_size + 1]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.window(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() with the async ORM (api/async_views.py)."""
+        return self.set_page([row async for row in self.window(queryset, request)])
+
+    def set_page(self, results):
+        self.page = results[: self.page_size]
+        self.has_next = len(results) > self.page_size
+        return self.page
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def seek_filter(self, position):
+        """
+        Lexicographic "row value" comparison, expanded for portability:
+        (a < x) OR (a = x AND b < y) OR ...
+        """
+        op = "lt" if self.descending else "gt"
+        condition = Q()
+        equal = {}
+        for field in self.fields:
+            condition |= Q(**equal, **{f"{field}__{op}": position[field]})
+            equal[field] = position[field]
+        return condition
+
+    def get_position(self, instance):
+        return [str(getattr(instance, field)) for field in self.fields]
+
+    def encode_position(self, instance):
+        """Opaque token for "the page after `instance`"."""
+        raw = json.dumps(self.get_position(instance), separators=(",", ":"))
+        return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def encode_cursor(self, instance):
+        token = self.encode_position(instance)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            values = json.loads(raw)
+            if len(values) != len(self.fields):
+                raise ValueError
+            return {field: self.to_python(model, field, value) for field, value in zip(self.fields, values)}
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, model, field, value):
+        try:
+            return model._meta.get_field(field).to_python(value)
+        except FieldDoesNotExist:
+            return value  # annotation (e.g. a Lower() sort key): kept as a string
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", None),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class PostFeedPagination(KeysetPagination):
+    """Newest posts first; used by the home feed and by profile pages (?author=)."""
+    ordering = ("-created_at", "-id")
+
+
+class ReactionPagination(KeysetPagination):
+    """Most recent reactions first, for the "who reacted" list of a post."""
+    ordering = ("-id",)
+
+
+class CommentPagination(KeysetPagination):
+    """Oldest first, like a conversation; used for root comments and "load more replies"."""
+    ordering = ("created_at", "id")
+
+
+class UserDirectoryPagination(KeysetPagination):
+    """Alphabetical, case-insensitive (username_key is annotated by UserViewSet)."""
+    ordering = ("username_key", "id")
+    page_size = 20
+
+
+class SearchPagination(KeysetPagination):
+    """
+    Best match first, over (id, rank) rows from api.search.ranked() rather than
+    a queryset: the position is the last row's (rank, id).
+    """
+    ordering = ("-rank", "-id")
+    page_size = 20
+
+    def paginate_rows(self, fetch, request):
+        """`fetch(after, limit)` -> [(id, rank)]; returns this page's rows."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        after = (position["rank"], position["id"]) if position else None
+        rows = fetch(after, self.page_size + 1)
+        self.has_next = len(rows) > self.page_size
+        return rows[: self.page_size]
+
+    def decode_cursor(self, request, model=None):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            rank, pk = json.loads(urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+            return {"rank": float(rank), "id": int(pk)}
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
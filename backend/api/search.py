@@ -0,0 +1,122 @@
+# backend/api/search.py
+"""
+Full-text search over posts (content) and users (username, names, bio).
+
+The index lives in the database and is maintained by the database itself, so
+every write path (save, delete, queryset.update, admin, raw SQL) keeps it current:
+  - SQLite: FTS5 external-content tables (api_post_fts, api_user_fts) synced by
+    triggers on api_post / api_user, ranked with bm25(),
+  - PostgreSQL: a generated tsvector column (search_vector) with a GIN index,
+    ranked with ts_rank(); both the indexed text and the query go through
+    immutable_unaccent() (the unaccent extension), so accents never matter,
+    as with FTS5's remove_diacritics on SQLite,
+  - anything else: an unindexed icontains fallback (rank 0).
+See migrations 0016_search_index and 0019_search_unaccent for the DDL.
+
+Queries are reduced to word tokens and every token must match as a prefix
+("mar sil" finds "Maria Silva"). `ranked()` returns (id, rank) rows, best first,
+for the keyset-paginated /api/search/; `matching_ids()` is a subquery for
+filtering querysets (admin changelists).
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Post, User
+
+MAX_TERMS = 8
+
+
+@dataclass(frozen=True)
+class Index:
+    model: type
+    table: str  # FTS5 table (SQLite)
+    fields: tuple
+    weights: tuple  # per field, bm25() weights
+
+    @property
+    def source(self):
+        return self.model._meta.db_table
+
+
+INDEXES = {
+    "posts": Index(Post, "api_post_fts", ("content",), (1.0,)),
+    "users": Index(User, "api_user_fts", ("username", "first_name", "last_name", "bio"), (10.0, 5.0, 5.0, 1.0)),
+}
+
+
+def terms(query):
+    """Word tokens of a user query (what the index can match), at most MAX_TERMS."""
+    return re.findall(r"\w+", query or "")[:MAX_TERMS]
+
+
+def _vendor():
+    return connection.vendor
+
+
+def _match_sql(index, words):
+    """(FROM/WHERE clause selecting `id`, `rank`, params) for the current database."""
+    if _vendor() == "sqlite":
+        expression = " ".join(f'"{w}"*' for w in words)
+        weights = ", ".join(str(w) for w in index.weights)
+        sql = f"SELECT rowid AS id, -bm25({index.table}, {weights}) AS rank FROM {index.table} WHERE {index.table} MATCH %s"
+        return sql, [expression]
+    if _vendor() == "postgresql":
+        expression = " & ".join(f"{w}:*" for w in words)
+        sql = (
+            f"SELECT id, ts_rank(search_vector, to_tsquery('simple', immutable_unaccent(%s))) AS rank "
+            f"FROM {index.source} WHERE search_vector @@ to_tsquery('simple', immutable_unaccent(%s))"
+        )
+        return sql, [expression, expression]
+    return None, None
+
+
+def _fallback_q(index, words):
+    condition = Q()
+    for word in words:
+        any_field = Q()
+        for field in index.fields:
+            any_field |= Q(**{f"{field}__icontains": word})
+        condition &= any_field
+    return condition
+
+
+def matching_ids(index_name, query):
+    """An `id__in=` value matching `query`, usable on the index's model."""
+    index, words = INDEXES[index_name], terms(query)
+    if not words:
+        return index.model.objects.none().values("id")
+    sql, params = _match_sql(index, words)
+    if sql is None:
+        return index.model.objects.filter(_fallback_q(index, words)).values("id")
+    return RawSQL(f"SELECT id FROM ({sql}) AS matches", params)
+
+
+def ranked(index_name, query, after=None, limit=20):
+    """
+    [(id, rank)] best match first (rank desc, id desc), starting after the
+    (rank, id) position `after`.
+    """
+    index, words = INDEXES[index_name], terms(query)
+    if not words:
+        return []
+    sql, params = _match_sql(index, words)
+    if sql is None:
+        qs = index.model.objects.filter(_fallback_q(index, words))
+        if after is not None:
+            qs = qs.filter(id__lt=after[1])
+        return [(pk, 0.0) for pk in qs.order_by("-id").values_list("id", flat=True)[:limit]]
+
+    seek = ""
+    if after is not None:
+        seek = "WHERE rank < %s OR (rank = %s AND id < %s)"
+        params = [*params, after[0], after[0], after[1]]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id, rank FROM ({sql}) AS matches {seek} ORDER BY rank DESC, id DESC LIMIT %s",
+            [*params, limit],
+        )
+        return cursor.fetchall()
@@ -2,17 +2,63 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.urls import reverse
 from .models import Post, PostImage, Reaction, Comment
-from django.db.models import Count
+from . import cache as post_cache
+from .counters import comment_counts, reaction_counts
+from .pagination import CommentPagination
+from django.db import models
 
 
 User = get_user_model()
 
 
+# ---------- Media URLs ----------
+def absolute_url(request, url):
+    return request.build_absolute_uri(url) if request else url
+
+
+def rendition_urls(field_file, renditions, request):
+    """{name: URL} for a renditions dict built by api/images.py."""
+    return {name: absolute_url(request, field_file.storage.url(r["name"])) for name, r in renditions.items()}
+
+
+def rendition_srcset(field_file, renditions, request):
+    """The same renditions as an <img srcset> value ("<url> <width>w, ...")."""
+    ordered = sorted(renditions.values(), key=lambda r: r["width"])
+    return ", ".join(f'{absolute_url(request, field_file.storage.url(r["name"]))} {r["width"]}w' for r in ordered)
+
+
+# ---------- Sparse fieldsets ----------
+class DynamicFieldsMixin:
+    """
+    Optional `fields` / `expand` kwargs (the viewsets fill them from ?fields= / ?expand=):
+      fields: keep only these fields in the output
+      expand: nested relations listed in Meta.expandable that are rendered in full;
+              the others collapse to their primary key. None means "expand everything".
+    """
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requested_fields = fields
+        self.requested_expand = expand
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+        if expand is not None:
+            for name in getattr(self.Meta, "expandable", ()):
+                if name in self.fields and name not in expand:
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
 # ---------- User ----------
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     avatar = serializers.SerializerMethodField()
     cover = serializers.SerializerMethodField()
+    # {thumb, feed, full} URLs of the resized copies ({} until processed)
+    avatar_renditions = serializers.SerializerMethodField()
+    cover_renditions = serializers.SerializerMethodField()
 
     # keep password here but write_only so it never leaks
     password = serializers.CharField(write_only=True, required=False, allow_blank=False)
@@ -29,6 +75,8 @@ class UserSerializer(serializers.ModelSerializer):
             "avatar",
             "bio",
             "cover",
+            "avatar_renditions",
+            "cover_renditions",
             "password",            # <- IMPORTANT: include it here
         ]
         extra_kwargs = {
@@ -52,6 +100,12 @@ class UserSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(url) if request else url
         return None
 
+    def get_avatar_renditions(self, obj):
+        return rendition_urls(obj.avatar, obj.avatar_renditions, self.context.get("request")) if obj.avatar else {}
+
+    def get_cover_renditions(self, obj):
+        return rendition_urls(obj.cover, obj.cover_renditions, self.context.get("request")) if obj.cover else {}
+
     def create(self, validated_data):
         # pop password and hash it
         password = validated_data.pop("password", None)
@@ -78,116 +132,102 @@ class UserSerializer(serializers.ModelSerializer):
 # ---------- Post images ----------
 class PostImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    # Resized copies: {thumb, feed, full} URLs and a ready-made srcset.
+    # Both are empty until `status` is "ready"; `image` is always the original.
+    renditions = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = PostImage
-        fields = ["id", "image"]
+        fields = ["id", "image", "status", "renditions", "srcset"]
 
     def get_image(self, obj):
         request = self.context.get("request")
         url = obj.image.url
         return request.build_absolute_uri(url) if request else url
 
+    def get_renditions(self, obj):
+        return rendition_urls(obj.image, obj.renditions, self.context.get("request"))
 
-# ---------- Reactions ----------
-class ReactionSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
-
-    class Meta:
-        model = Reaction
-        fields = ["id", "user", "post", "type"]
-
-
-# ---------- Comments ----------
-class CommentSerializer(serializers.ModelSerializer):
-    author = UserSerializer(read_only=True)
-    replies = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Comment
-        fields = ["id", "post", "author", "content", "parent", "created_at", "replies"]
-        read_only_fields = ["author", "created_at"]
-
-    def get_replies(self, obj):
-        # simple 1-level nesting
-        children = obj.replies.all().select_related("author")
-        return CommentSerializer(children, many=True, context=self.context).data
+    def get_srcset(self, obj):
+        return rendition_srcset(obj.image, obj.renditions, self.context.get("request"))
 
 
-# ---------- Posts ----------
-class PostSerializer(serializers.ModelSerializer):
-    author = UserSerializer(read_only=True)
-    images = PostImageSerializer(many=True, read_only=True)
-    reactions = ReactionSerializer(many=True, read_only=True)
-
-    # useful, FB-like summary fields
-    reactions_count = serializers.SerializerMethodField()
-    my_reaction = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
+# ---------- Users (compact, for nesting) ----------
+class UserMiniSerializer(serializers.ModelSerializer):
+    # Nested authors are shown small: the thumbnail when there is one
+    avatar = serializers.SerializerMethodField()
 
     class Meta:
-        model = Post
-        fields = [
-            "id",
-            "author",
-            "content",
-            "created_at",
-            "updated_at",
-            "images",
-            "reactions",
-            "reactions_count",
-            "my_reaction",
-            "comments_count",
-        ]
-
-    def get_reactions_count(self, obj):
-        return obj.reactions.count()
+        model = User
+        fields = ("id", "username", "role", "avatar")
 
-    def get_my_reaction(self, obj):
-        request = self.context.get("request")
-        if not request or not request.user.is_authenticated:
+    def get_avatar(self, obj):
+        if not obj.avatar:
             return None
-        r = obj.reactions.filter(user=request.user).first()
-        return r.type if r else None
+        thumb = obj.avatar_renditions.get("thumb")
+        url = obj.avatar.storage.url(thumb["name"]) if thumb else obj.avatar.url
+        return absolute_url(self.context.get("request"), url)
 
-    def get_comments_count(self, obj):
-        # count only top-level comments (or total, your choice)
-        return obj.comments.count()
 
+class UserDirectorySerializer(DynamicFieldsMixin, UserMiniSerializer):
+    """Directory / autocomplete rows (GET /api/users/): no email, bio or cover."""
 
-class PostImageSerializer(serializers.ModelSerializer):
-    image = serializers.SerializerMethodField()
-
-    class Meta:
-        model = PostImage
-        fields = ["id", "image"]
-
-    def get_image(self, obj):
-        request = self.context.get("request")
-        url = obj.image.url
-        return request.build_absolute_uri(url) if request else url
-
-
-
-class UserMiniSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = User
-        fields = ("id", "username", "role", "avatar")
+    class Meta(UserMiniSerializer.Meta):
+        fields = ("id", "username", "first_name", "last_name", "role", "avatar")
 
 
-class CommentSerializer(serializers.ModelSerializer):
+# ---------- Comments ----------
+class CommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = UserMiniSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
+    # Total direct replies, and where to fetch the ones not inlined in `replies`
+    replies_count = serializers.IntegerField(source="reply_count", read_only=True)
+    replies_next = serializers.SerializerMethodField()
 
     class Meta:
         model = Comment
-        fields = ("id", "post", "author", "parent", "content", "created_at", "replies")
+        fields = (
+            "id", "post", "author", "parent", "content", "created_at",
+            "replies", "replies_count", "replies_next",
+        )
         read_only_fields = ("author", "created_at", "replies")
+        expandable = ("author",)
+
+    def inline_replies(self, obj):
+        """
+        Replies preloaded by CommentViewSet.build_reply_map (first N per comment,
+        grouped by parent id), or None when the serializer is used on its own.
+        """
+        reply_map = self.context.get("reply_map")
+        if reply_map is None:
+            return None
+        if self.context.get("reply_level", 0) >= self.context["max_depth"]:
+            return []
+        return reply_map.get(obj.id, [])
 
     def get_replies(self, obj):
-        # One level of nested replies; you can expand if you want deeper trees
-        qs = obj.replies.select_related("author").all().order_by("created_at")
-        return CommentSerializer(qs, many=True, context=self.context).data
+        children = self.inline_replies(obj)
+        context = self.context
+        if children is None:
+            # Not loaded by CommentViewSet (e.g. create response): one level, one query
+            children = obj.replies.select_related("author").all().order_by("created_at")
+        else:
+            context = {**context, "reply_level": context.get("reply_level", 0) + 1}
+        return CommentSerializer(
+            children, many=True, context=context,
+            fields=self.requested_fields, expand=self.requested_expand,
+        ).data
+
+    def get_replies_next(self, obj):
+        shown = self.inline_replies(obj)
+        if shown is None or obj.reply_count <= len(shown):
+            return None
+        url = reverse("comment-replies", args=[obj.id])
+        if shown:
+            url += "?cursor=" + CommentPagination().encode_position(shown[-1])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
 
     def create(self, validated_data):
         # author from request.user
@@ -196,47 +236,87 @@ class CommentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ReactionSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+# ---------- Reactions ----------
+class ReactionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # Compact user: "who reacted" lists can be long
+    user = UserMiniSerializer(read_only=True)
 
     class Meta:
         model = Reaction
         fields = ["id", "user", "post", "type"]
+        expandable = ("user",)
 
-REACTION_KEYS = [k for k, _ in Reaction.Types.choices]  # ['einstein','shakespeare','davinci','mandela']
 
-class PostSerializer(serializers.ModelSerializer):
+# ---------- Posts ----------
+class PostListSerializer(serializers.ListSerializer):
+    """A page of posts goes through the fragment cache with one get_many/set_many."""
+
+    def to_representation(self, data):
+        posts = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return self.child.represent_many(list(posts))
+
+
+class PostSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = UserMiniSerializer(read_only=True)
     images = PostImageSerializer(many=True, read_only=True)
-    reactions = ReactionSerializer(many=True, read_only=True)
 
+    # Reactions are summarized (counts + mine) so the payload does not grow with
+    # reaction volume; the full list lives at /api/posts/{id}/reactions/.
     reaction_counts = serializers.SerializerMethodField()
     my_reaction = serializers.SerializerMethodField()
+    comments_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
         fields = (
             "id", "author", "content", "created_at", "updated_at",
-            "images", "reactions",
+            "images",
             "reaction_counts", "my_reaction",
+            "comments_count",
         )
+        expandable = ("author",)
+        list_serializer_class = PostListSerializer
 
-    def get_reaction_counts(self, obj):
-        # Start with zeros so frontend keys are always present
-        counts = {k: 0 for k in REACTION_KEYS}
+    def to_representation(self, instance):
+        return self.represent_many([instance])[0]
 
-        # Use the prefetched reactions (no extra queries)
-        for r in getattr(obj, "reactions").all():
-            if r.type in counts:
-                counts[r.type] += 1
+    def represent_many(self, posts):
+        # Only the default shape is cached; ?fields= / ?expand= variants render directly
+        if self.requested_fields is None and self.requested_expand is None:
+            fragments = post_cache.get_fragments(posts, self.render_fragment, self.context.get("request"))
+        else:
+            fragments = [self.render_fragment(post) for post in posts]
+
+        # my_reaction is per viewer, so it is never part of the cached fragment
+        if "my_reaction" in self.fields:
+            for post, data in zip(posts, fragments):
+                data["my_reaction"] = self.get_my_reaction(post)
+        return fragments
+
+    def render_fragment(self, instance):
+        self._rendering_fragment = True
+        try:
+            data = super().to_representation(instance)
+        finally:
+            self._rendering_fragment = False
+        data.pop("my_reaction", None)
+        return data
 
-        counts["total"] = sum(counts.values())
-        return counts
+    def get_reaction_counts(self, obj):
+        # Read the denormalized counters on Post (no reaction rows loaded)
+        return reaction_counts(obj)
+
+    def get_comments_count(self, obj):
+        # {"total", "top_level"} from the denormalized counters on Post
+        return comment_counts(obj)
 
     def get_my_reaction(self, obj):
         request = self.context.get("request")
         user = getattr(request, "user", None)
-        if not user or not user.is_authenticated:
+        if not user or not user.is_authenticated or getattr(self, "_rendering_fragment", False):
             return None
+        # Annotated by PostViewSet.get_queryset for the whole page at once
+        if hasattr(obj, "my_reaction_type"):
+            return obj.my_reaction_type
         mine = obj.reactions.filter(user_id=user.id).first()
         return mine.type if mine else None
\ No newline at end of file
@@ -0,0 +1,134 @@
+# backend/api/storage.py
+"""
+Content-addressed media storage for PostImage.image, User.avatar and User.cover.
+
+Files are named by the SHA-256 of their bytes, under the field's upload_to
+directory and a two-character shard: posts/3f/3fa9...c1.jpg. Saving a file
+that is already stored writes nothing and returns the existing name, so every
+unique blob exists once however many rows point at it. The hash is computed
+while the upload is streamed to a temporary file next to its final location
+(no second pass over the data, no in-memory copy), then moved into place
+atomically. Uploads parsed by api/uploads.py arrive already hashed: they are
+written at most once, or just renamed if they were staged on disk. Names never
+change for given bytes, so URLs are cacheable forever.
+
+Blobs are shared by every row with the same bytes, and no reference counts are
+kept: nothing deletes a blob inline, since a request may be about to save a row
+that dedupes onto the very blob another request just stopped using. `release()`
+only marks a blob a row no longer points at; `manage.py gc_media` scans the rows
+for what is still referenced and deletes the rest once it has been left
+untouched for its grace period. Every dedupe hit touches the
+blob too, so a file that just got a new reference is never that old.
+Renditions (api/images.py) go through the same storage and dedupe the same way.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db.models import FileField
+from django.utils.functional import cached_property
+
+CHUNK_SIZE = 64 * 1024
+HASHED_NAME = re.compile(r"(?:^|/)[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})(?:\.\w+)?$")
+
+
+def content_digest(name):
+    """The SHA-256 a content-addressed name was derived from, or None for legacy names."""
+    match = HASHED_NAME.search(name)
+    return match["digest"] if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # The final name is only known once the content is hashed (_save)
+        return name
+
+    @property
+    def staging_dir(self):
+        """Where api/uploads.py spills large uploads: same filesystem, so moving them in is a rename."""
+        return self.path(".uploads")
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        ext = posixpath.splitext(name)[1].lower()
+
+        def final_name(hexdigest):
+            return posixpath.join(directory, hexdigest[:2], hexdigest + ext)
+
+        # Hashed while it was received (api/uploads.py)
+        known = getattr(content, "sha256", None)
+        if known:
+            if self.touch(final_name(known)):
+                return final_name(known)  # already stored: dedupe without writing
+            staged = getattr(content, "temporary_file_path", lambda: None)()
+            if staged and os.path.dirname(staged) == self.staging_dir:
+                return self._move_into_place(staged, final_name(known))
+
+        tmp_dir = self.path(directory)
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    if not known:
+                        digest.update(chunk)
+                    tmp.write(chunk)
+
+            final = final_name(known or digest.hexdigest())
+            if self.touch(final):
+                return final  # already stored: dedupe
+            return self._move_into_place(tmp_path, final)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _move_into_place(self, tmp_path, final):
+        final_path = self.path(final)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(tmp_path, self.file_permissions_mode)
+        os.replace(tmp_path, final_path)
+        return final
+
+    @cached_property
+    def reference_fields(self):
+        """[(model, field name)] for every FileField stored here."""
+        return [
+            (model, field.name)
+            for model in apps.get_models()
+            for field in model._meta.get_fields()
+            if isinstance(field, FileField) and field.storage is self
+        ]
+
+    def touch(self, name):
+        """
+        Mark `name` as just used (gc_media keeps files younger than its --min-age).
+        False if it does not exist.
+        """
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def release(self, name):
+        """
+        A row stopped pointing at `name`. Not deleted here (see the module
+        docstring): gc_media removes it after its grace period if by then
+        nothing references it.
+        """
+        if name:
+            self.touch(name)
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def media_storage():
+    """Storage callable for the model fields (keeps the instance out of migrations)."""
+    return content_addressed_storage
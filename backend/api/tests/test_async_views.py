@@ -0,0 +1,89 @@
+# What it checks:
+# Under ASGI the feed, post detail, comment list and /api/me/ are served by api/async_views.py
+# with the same JSON, status codes and validators as the DRF views they stand in for.
+# Errors (401, 404, bad cursor) and 304 revalidation go through DRF's own handling.
+# Writes at the same URLs still reach the DRF viewsets.
+# (The routes are opt-in via ASYNC_READ_VIEWS; this module mounts them with its own URLconf.)
+
+
+# backend/api/tests/test_async_views.py
+import json
+
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from django.urls import include, path, resolve, reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from api import async_views, urls as api_urls
+from api.models import Comment, Post, Reaction
+
+User = get_user_model()
+
+urlpatterns = [
+    path("api/", include(api_urls.async_read_urlpatterns + api_urls.urlpatterns)),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestAsyncReadViews(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username="alice", password="p", role="student")
+        self.bob = User.objects.create_user(username="bob", password="p", role="student")
+        self.posts = [Post.objects.create(author=self.bob, content=f"post {i}") for i in range(4)]
+        root = Comment.objects.create(post=self.posts[0], author=self.bob, content="root")
+        Comment.objects.create(post=self.posts[0], author=self.alice, parent=root, content="reply")
+        Reaction.objects.create(user=self.alice, post=self.posts[1], type="mandela")
+        token = self.client.post(reverse("token_obtain_pair"), {"username": "alice", "password": "p"}).data["access"]
+        self.auth = {"Authorization": f"Bearer {token}"}
+
+    def drf(self, sync_view, path, **kwargs):
+        """The same request answered by the DRF view."""
+        request = APIRequestFactory().get(path, HTTP_AUTHORIZATION=self.auth["Authorization"])
+        response = sync_view(request, **kwargs)
+        response.render()
+        return response
+
+    async def test_routed_to_async_views(self):
+        self.assertIs(resolve(reverse("post-list")).func, async_views.post_list)
+        self.assertIs(resolve(reverse("post-detail", args=[1])).func, async_views.post_detail)
+        self.assertIs(resolve(reverse("post-batch")).func.cls, async_views.PostViewSet)
+
+    async def test_same_responses_as_drf(self):
+        post = self.posts[0]
+        cases = [
+            (reverse("post-list") + "?page_size=2", async_views.post_list_view, {}),
+            (reverse("post-list") + "?fields=id,content&expand=author", async_views.post_list_view, {}),
+            (reverse("post-detail", args=[post.id]), async_views.post_detail_view, {"pk": str(post.id)}),
+            (reverse("comment-list") + f"?post={post.id}", async_views.comment_list_view, {}),
+            (reverse("me"), async_views.sync_me, {}),
+        ]
+        for path, sync_view, kwargs in cases:
+            res = await self.async_client.get(path, headers=self.auth)
+            expected = await sync_to_async(self.drf)(sync_view, path, **kwargs)
+            self.assertEqual(res.status_code, 200, res.content)
+            self.assertEqual(json.loads(res.content), json.loads(expected.content), path)
+            self.assertEqual(res.get("ETag"), expected.get("ETag"), path)
+
+    async def test_errors_and_revalidation(self):
+        self.assertEqual((await self.async_client.get(reverse("post-list"))).status_code, 401)
+        missing = await self.async_client.get(reverse("post-detail", args=[999]), headers=self.auth)
+        self.assertEqual(missing.status_code, 404)
+        bad_cursor = await self.async_client.get(reverse("post-list") + "?cursor=nope", headers=self.auth)
+        self.assertEqual(bad_cursor.status_code, 404)
+
+        first = await self.async_client.get(reverse("post-list"), headers=self.auth)
+        again = await self.async_client.get(reverse("post-list"), headers={**self.auth, "If-None-Match": first["ETag"]})
+        self.assertEqual(again.status_code, 304)
+
+    async def test_writes_reach_drf(self):
+        res = await self.async_client.post(
+            reverse("post-list"), {"content": "from async"}, content_type="application/json", headers=self.auth
+        )
+        self.assertEqual(res.status_code, 201, res.content)
+        res = await self.async_client.patch(
+            reverse("post-detail", args=[res.json()["id"]]), {"content": "edited"},
+            content_type="application/json", headers=self.auth,
+        )
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(res.json()["content"], "edited")
@@ -0,0 +1,45 @@
+# What it checks:
+# After the first request, JWT authentication serves the user from the cache (no user query).
+# Saving the user (role change, deactivation) evicts the entry: the next request sees the new row.
+# A deleted user's token stops working immediately.
+
+
+# backend/api/tests/test_authentication.py
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+User = get_user_model()
+
+
+class TestCachedJWTAuthentication(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="p", role="student")
+        token = self.client.post(reverse("token_obtain_pair"), {"username": "alice", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_user_is_cached(self):
+        self.assertEqual(self.client.get(reverse("me")).status_code, 200)
+        with self.assertNumQueries(0):
+            res = self.client.get(reverse("me"))
+        self.assertEqual(res.data["username"], "alice")
+
+    def test_save_evicts(self):
+        self.client.get(reverse("me"))
+        self.user.role = "teacher"
+        self.user.save(update_fields=["role"])
+        self.assertEqual(self.client.get(reverse("me")).data["role"], "teacher")
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertEqual(self.client.get(reverse("me")).status_code, 401)
+
+    def test_profile_update_through_api_evicts(self):
+        self.client.get(reverse("me"))
+        self.client.patch(reverse("user-detail", args=[self.user.id]), {"bio": "hello"}, format="json")
+        self.assertEqual(self.client.get(reverse("me")).data["bio"], "hello")
+
+    def test_deleted_user_rejected(self):
+        self.client.get(reverse("me"))
+        self.user.delete()
+        self.assertEqual(self.client.get(reverse("me")).status_code, 401)
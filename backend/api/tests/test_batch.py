@@ -0,0 +1,67 @@
+# What it checks:
+# GET /api/posts/batch/?ids= and /api/users/batch/?ids= return objects in request order,
+# list ids that do not exist under `missing`, and reject malformed or oversized id lists.
+# The public user batch has the directory shape (no email, bio or cover).
+# A batch costs the same number of queries whatever its size; ?fields= still applies.
+
+
+# backend/api/tests/test_batch.py
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from api.models import Post
+
+User = get_user_model()
+
+
+class TestBatch(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="ana", password="p", email="ana@example.com")
+        self.other = User.objects.create_user(username="bruno", password="p", email="bruno@example.com")
+        self.posts = [Post.objects.create(author=self.user, content=f"post {i}") for i in range(5)]
+        token = self.client.post(reverse("token_obtain_pair"), {"username": "ana", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def batch(self, name, ids, **params):
+        return self.client.get(reverse(f"{name}-batch"), {"ids": ids, **params})
+
+    def test_posts_in_request_order_with_missing(self):
+        a, b, c = self.posts[3].id, self.posts[0].id, self.posts[2].id
+        res = self.batch("post", f"{a},999,{b},{a},{c}")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([p["id"] for p in res.data["results"]], [a, b, c])
+        self.assertEqual(res.data["missing"], [999])
+
+    def test_users_public(self):
+        self.client.credentials()
+        res = self.batch("user", f"{self.other.id},{self.user.id}")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([u["username"] for u in res.data["results"]], ["bruno", "ana"])
+        self.assertEqual(res.data["missing"], [])
+        for private in ("email", "bio", "cover"):
+            self.assertNotIn(private, res.data["results"][0])
+
+    def test_posts_require_authentication(self):
+        self.client.credentials()
+        self.assertEqual(self.batch("post", str(self.posts[0].id)).status_code, 401)
+
+    @override_settings(BATCH_MAX_IDS=3)
+    def test_invalid_ids(self):
+        self.assertEqual(self.batch("post", "1,x").status_code, 400)
+        self.assertEqual(self.batch("post", "").status_code, 400)
+        self.assertEqual(self.batch("post", "1,2,3,4").status_code, 400)
+        self.assertEqual(self.batch("post", "1,1,2,2,3").status_code, 200)
+
+    def test_constant_queries_and_sparse_fields(self):
+        def count(ids):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.batch("post", ",".join(str(p.id) for p in ids), fields="id,content,author,images")
+            self.assertEqual(set(res.data["results"][0]), {"id", "content", "author", "images"})
+            return len(ctx.captured_queries)
+
+        count(self.posts[:1])  # warm-up: authenticated user cache
+        self.assertEqual(count(self.posts[:1]), count(self.posts))
@@ -0,0 +1,102 @@
+# What it checks:
+# Feed posts are served from the fragment cache on repeat reads.
+# Reacting, editing, uploading an image or changing the author's avatar invalidates exactly that fragment.
+# my_reaction is per viewer and never leaks through the cache.
+
+
+# backend/api/tests/test_cache.py
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from api import cache as post_cache
+from api.models import Post
+
+User = get_user_model()
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TestPostFragmentCache(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username="alice", password="p", role="student")
+        self.bob = User.objects.create_user(username="bob", password="p", role="student")
+        self.posts = [Post.objects.create(author=self.alice, content=f"p{i}") for i in range(3)]
+
+        tok = reverse("token_obtain_pair")
+        self.alice_token = self.client.post(tok, {"username": "alice", "password": "p"}).data["access"]
+        self.bob_token = self.client.post(tok, {"username": "bob", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.alice_token}")
+
+    def feed(self, mutate=None):
+        # Cache activity of `mutate()` (whose response may re-render the post) plus one feed read
+        before = post_cache.stats()
+        if mutate:
+            mutate()
+        res = self.client.get(reverse("post-list"))
+        after = post_cache.stats()
+        return res, after["hits"] - before["hits"], after["misses"] - before["misses"]
+
+    def test_repeat_reads_hit(self):
+        _, hits, misses = self.feed()
+        self.assertEqual((hits, misses), (0, 3))
+        _, hits, misses = self.feed()
+        self.assertEqual((hits, misses), (3, 0))
+
+    def test_reaction_invalidates_one_post(self):
+        self.feed()
+        res, hits, misses = self.feed(lambda: self.client.post(
+            reverse("post-react", args=[self.posts[0].id]), {"type": "einstein"}, format="json"
+        ))
+        self.assertEqual(misses, 1)
+        first = next(p for p in res.data["results"] if p["id"] == self.posts[0].id)
+        self.assertEqual(first["reaction_counts"]["einstein"], 1)
+        self.assertEqual(first["my_reaction"], "einstein")
+
+        # Same cached fragment, other viewer: no my_reaction
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.bob_token}")
+        res, hits, misses = self.feed()
+        self.assertEqual(misses, 0)
+        first = next(p for p in res.data["results"] if p["id"] == self.posts[0].id)
+        self.assertIsNone(first["my_reaction"])
+
+    def test_edit_and_image_upload_invalidate(self):
+        self.feed()
+        res, hits, misses = self.feed(lambda: self.client.patch(
+            reverse("post-detail", args=[self.posts[1].id]), {"content": "edited"}, format="json"
+        ))
+        self.assertEqual(misses, 1)
+        self.assertIn("edited", [p["content"] for p in res.data["results"]])
+
+        gif = SimpleUploadedFile(
+            "dot.gif",
+            b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00"
+            b",\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;",
+            content_type="image/gif",
+        )
+        _, hits, misses = self.feed(lambda: self.client.post(
+            reverse("post-upload-image", args=[self.posts[2].id]), {"image": gif}, format="multipart"
+        ))
+        self.assertEqual(misses, 1)
+
+    def test_avatar_change_invalidates_author_posts(self):
+        self.feed()
+        self.alice.avatar = "avatars/new.jpg"
+        self.alice.save(update_fields=["avatar"])
+        res, hits, misses = self.feed()
+        self.assertEqual((hits, misses), (0, 3))
+        self.assertTrue(res.data["results"][0]["author"]["avatar"].endswith("avatars/new.jpg"))
@@ -0,0 +1,142 @@
+# What it checks:
+# Replies save their thread root and depth automatically.
+# /api/comments/?post=<id> nests replies to any depth with a constant number of queries.
+# ?depth=<n> trims the tree.
+# Only the first few replies are inlined; replies_count/replies_next lead to the rest.
+# Feed posts carry comments_count {total, top_level}, kept in sync on create/delete and by reconcile_comment_counts.
+
+
+# backend/api/tests/test_comments.py
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from api.models import Post, Comment
+
+User = get_user_model()
+
+
+class TestCommentThreads(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="talker", password="p", role="student")
+        self.post = Post.objects.create(author=self.user, content="discuss")
+
+        tok = reverse("token_obtain_pair")
+        token = self.client.post(tok, {"username": "talker", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def make_chain(self, length):
+        parent = None
+        chain = []
+        for i in range(length):
+            parent = Comment.objects.create(post=self.post, author=self.user, parent=parent, content=f"c{i}")
+            chain.append(parent)
+        return chain
+
+    def test_reply_gets_root_and_depth(self):
+        root, child, grandchild = self.make_chain(3)
+        self.assertIsNone(root.root_id)
+        self.assertEqual((child.root_id, child.depth), (root.id, 1))
+        self.assertEqual((grandchild.root_id, grandchild.depth), (root.id, 2))
+
+    def test_deep_tree_constant_queries(self):
+        for _ in range(4):
+            self.make_chain(5)
+
+        url = reverse("comment-list") + f"?post={self.post.id}"
+        # auth user + roots + every reply of every thread
+        with self.assertNumQueries(3):
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(len(res.data["results"]), 4)
+
+        node, depth = res.data["results"][0], 0
+        while node["replies"]:
+            node, depth = node["replies"][0], depth + 1
+        self.assertEqual(depth, 4)
+
+    def test_depth_param(self):
+        self.make_chain(4)
+        res = self.client.get(reverse("comment-list") + f"?post={self.post.id}&depth=1")
+        root = res.data["results"][0]
+        self.assertEqual(len(root["replies"]), 1)
+        self.assertEqual(root["replies"][0]["replies"], [])
+
+    def test_retrieve_subtree(self):
+        chain = self.make_chain(4)
+        res = self.client.get(reverse("comment-detail", args=[chain[1].id]))
+        self.assertEqual(res.data["replies"][0]["id"], chain[2].id)
+        self.assertEqual(res.data["replies"][0]["replies"][0]["id"], chain[3].id)
+
+    @override_settings(COMMENT_INLINE_REPLIES=2)
+    def test_load_more_replies(self):
+        root = Comment.objects.create(post=self.post, author=self.user, content="root")
+        for i in range(5):
+            res = self.client.post(
+                reverse("comment-list"), {"post": self.post.id, "parent": root.id, "content": f"r{i}"}, format="json"
+            )
+            self.assertEqual(res.status_code, 201, res.content)
+
+        res = self.client.get(reverse("comment-list") + f"?post={self.post.id}")
+        data = res.data["results"][0]
+        self.assertEqual(data["replies_count"], 5)
+        self.assertEqual([r["content"] for r in data["replies"]], ["r0", "r1"])
+
+        url, rest = data["replies_next"], []
+        while url:
+            page = self.client.get(url + "&page_size=2").data
+            rest += [r["content"] for r in page["results"]]
+            url = page["next"]
+        self.assertEqual(rest, ["r2", "r3", "r4"])
+
+    def test_reply_count_follows_deletes(self):
+        parent = None
+        for i in range(3):
+            res = self.client.post(
+                reverse("comment-list"), {"post": self.post.id, "parent": parent, "content": f"c{i}"}, format="json"
+            )
+            parent = res.data["id"]
+        root, child, grandchild = Comment.objects.order_by("id")
+        self.assertEqual((root.reply_count, child.reply_count), (1, 1))
+
+        self.client.delete(reverse("comment-detail", args=[grandchild.id]))
+        child.refresh_from_db()
+        self.assertEqual(child.reply_count, 0)
+        root.refresh_from_db()
+        self.assertEqual(root.reply_count, 1)
+
+    def test_post_comment_counters(self):
+        def add(parent, content):
+            res = self.client.post(
+                reverse("comment-list"), {"post": self.post.id, "parent": parent, "content": content}, format="json"
+            )
+            return res.data["id"]
+
+        first = add(None, "a")
+        add(None, "b")
+        reply = add(first, "a.1")
+        add(reply, "a.1.1")
+
+        counts = self.client.get(reverse("post-detail", args=[self.post.id])).data["comments_count"]
+        self.assertEqual(counts, {"total": 4, "top_level": 2})
+
+        # Deleting a reply also removes its own replies
+        self.client.delete(reverse("comment-detail", args=[reply]))
+        counts = self.client.get(reverse("post-detail", args=[self.post.id])).data["comments_count"]
+        self.assertEqual(counts, {"total": 2, "top_level": 2})
+
+        self.client.delete(reverse("comment-detail", args=[first]))
+        counts = self.client.get(reverse("post-detail", args=[self.post.id])).data["comments_count"]
+        self.assertEqual(counts, {"total": 1, "top_level": 1})
+
+    def test_reconcile_comment_counts(self):
+        self.make_chain(3)  # created behind the API's back: counters are stale
+        out = StringIO()
+        call_command("reconcile_comment_counts", stdout=out)
+        self.assertIn("1 post(s) and 2 comment(s)", out.getvalue())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.comment_count, self.post.root_comment_count), (3, 1))
@@ -0,0 +1,91 @@
+# What it checks:
+# Feed, post detail, user profile and /api/me/ send ETag/Last-Modified and answer 304 on revalidation.
+# A 304 costs at most one query (the authenticated user comes from the user cache).
+# Reactions, edits and profile changes produce a new ETag.
+# So do counter fixes by the reconcile commands, and counter writes within the same changed_at tick.
+
+
+# backend/api/tests/test_conditional.py
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from api.models import Comment, Post, Reaction
+
+User = get_user_model()
+
+
+class TestConditionalGet(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="p", role="student")
+        self.post = Post.objects.create(author=self.user, content="hi")
+
+        tok = reverse("token_obtain_pair")
+        token = self.client.post(tok, {"username": "alice", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def revalidate(self, url, queries):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200, first.content)
+        self.assertIn("ETag", first)
+        self.assertIn("Last-Modified", first)
+        with self.assertNumQueries(queries):
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second["ETag"], first["ETag"])
+        return first["ETag"]
+
+    def test_feed_and_detail(self):
+        # version stamps only
+        feed_tag = self.revalidate(reverse("post-list"), queries=1)
+        detail_url = reverse("post-detail", args=[self.post.id])
+        detail_tag = self.revalidate(detail_url, queries=1)
+
+        self.client.post(reverse("post-react", args=[self.post.id]), {"type": "einstein"}, format="json")
+        res = self.client.get(reverse("post-list"), HTTP_IF_NONE_MATCH=feed_tag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["results"][0]["my_reaction"], "einstein")
+
+        self.client.patch(detail_url, {"content": "edited"}, format="json")
+        res = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_tag)
+        self.assertEqual(res.status_code, 200)
+
+    def test_me_and_profile(self):
+        me_tag = self.revalidate(reverse("me"), queries=0)
+        profile_url = reverse("user-detail", args=[self.user.id])
+        profile_tag = self.revalidate(profile_url, queries=1)
+
+        self.client.patch(profile_url, {"bio": "new bio"}, format="json")
+        self.assertEqual(self.client.get(reverse("me"), HTTP_IF_NONE_MATCH=me_tag).status_code, 200)
+        self.assertEqual(self.client.get(profile_url, HTTP_IF_NONE_MATCH=profile_tag).status_code, 200)
+
+    def test_author_change_revalidates_feed(self):
+        feed_tag = self.revalidate(reverse("post-list"), queries=1)
+        self.user.avatar = "avatars/new.jpg"
+        self.user.save(update_fields=["avatar"])
+        res = self.client.get(reverse("post-list"), HTTP_IF_NONE_MATCH=feed_tag)
+        self.assertEqual(res.status_code, 200)
+
+    def test_reconciled_counters_revalidate(self):
+        bob = User.objects.create_user(username="bob", password="p", role="student")
+        detail_url = reverse("post-detail", args=[self.post.id])
+        for command, drift in [
+            ("reconcile_reaction_counts", lambda: Reaction.objects.create(user=bob, post=self.post, type="mandela")),
+            ("reconcile_comment_counts", lambda: Comment.objects.create(post=self.post, author=bob, content="c")),
+        ]:
+            tag = self.revalidate(detail_url, queries=1)
+            drift()  # a row the counters missed
+            before = Post.objects.get(pk=self.post.pk).changed_at
+            call_command(command, stdout=StringIO())
+            self.assertGreater(Post.objects.get(pk=self.post.pk).changed_at, before, command)
+            self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=tag).status_code, 200, command)
+
+    def test_counters_within_one_tick(self):
+        detail_url = reverse("post-detail", args=[self.post.id])
+        tag = self.revalidate(detail_url, queries=1)
+        # A counter write that leaves changed_at where it was (same millisecond on SQLite)
+        Post.objects.filter(pk=self.post.pk).update(comment_count=5)
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=tag).status_code, 200)
@@ -0,0 +1,77 @@
+# What it checks:
+# GET /api/users/ is a public, compact directory: no email/bio/cover, alphabetical, keyset-paginated.
+# ?q= matches a case-insensitive prefix of username, first or last name; ?role= filters by role.
+# Accented capital initials (Álvaro, Érica) are found whichever case the query uses, SQLite included.
+# The prefix filter is answered from the lower() expression indexes, not a table scan.
+
+
+# backend/api/tests/test_directory.py
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+User = get_user_model()
+
+
+class TestUserDirectory(APITestCase):
+    def setUp(self):
+        for username, first, last, role in [
+            ("Mariana", "Mariana", "Costa", "student"),
+            ("mario", "Mário", "Souza", "teacher"),
+            ("ana", "Ana", "Maranhão", "parent"),
+            ("bruno", "Bruno", "Lima", "student"),
+            ("carla", "Carla", "Dias", "teacher"),
+        ]:
+            User.objects.create_user(
+                username=username, password="p", first_name=first, last_name=last, role=role,
+                email=f"{username}@example.com", bio="secret",
+            )
+
+    def usernames(self, res):
+        return [u["username"] for u in res.data["results"]]
+
+    def test_compact_alphabetical_and_paginated(self):
+        res = self.client.get(reverse("user-list") + "?page_size=2")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(set(res.data["results"][0]), {"id", "username", "first_name", "last_name", "role", "avatar"})
+
+        names, url = [], reverse("user-list") + "?page_size=2"
+        while url:
+            res = self.client.get(url)
+            names += self.usernames(res)
+            url = res.data["next"]
+        self.assertEqual(names, ["ana", "bruno", "carla", "Mariana", "mario"])
+
+    def test_prefix_search(self):
+        res = self.client.get(reverse("user-list"), {"q": "MAR"})
+        # usernames Mariana/mario, plus Ana by last name Maranhão
+        self.assertEqual(self.usernames(res), ["ana", "Mariana", "mario"])
+        res = self.client.get(reverse("user-list"), {"q": "mari"})
+        self.assertEqual(self.usernames(res), ["Mariana", "mario"])
+
+    def test_accented_initials(self):
+        for username, first in [("alvaro", "Álvaro"), ("erica", "Érica"), ("ivo", "Ivo")]:
+            User.objects.create_user(username=username, password="p", first_name=first)
+        for q in ("Ál", "ál", "ÁL"):
+            res = self.client.get(reverse("user-list"), {"q": q})
+            self.assertEqual(self.usernames(res), ["alvaro"], q)
+        self.assertEqual(self.usernames(self.client.get(reverse("user-list"), {"q": "éRI"})), ["erica"])
+
+    def test_role_filter(self):
+        res = self.client.get(reverse("user-list"), {"q": "mar", "role": "teacher"})
+        self.assertEqual(self.usernames(res), ["mario"])
+        self.assertEqual(self.client.get(reverse("user-list"), {"role": "admin"}).status_code, 400)
+
+    def test_prefix_uses_index(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("user-list"), {"q": "mar", "page_size": 5})
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertNotIn('"password"', sql)
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+            self.assertIn("user_username_ci_idx", plan)
+            self.assertNotIn("SCAN api_user", plan)
@@ -0,0 +1,117 @@
+# What it checks:
+# Creating posts/comments and reacting publish events once the transaction commits.
+# The broker log is bounded: resuming from an id it no longer holds answers None (-> "reset").
+# /api/stream/ (ASGI only) needs a token, pushes events as they arrive, sends heartbeats while idle,
+# and resumes after Last-Event-ID.
+
+
+# backend/api/tests/test_events.py
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from api import events
+from api.models import Post
+
+User = get_user_model()
+
+
+@override_settings(EVENTS_LOG_SIZE=3, EVENTS_HEARTBEAT=0.05)
+class TestEvents(APITestCase):
+    def setUp(self):
+        events._brokers.clear()
+        self.broker = events.get_broker()
+        self.alice = User.objects.create_user(username="alice", password="p", role="teacher")
+        self.post = Post.objects.create(author=self.alice, content="hello")
+        self.token = self.client.post(
+            reverse("token_obtain_pair"), {"username": "alice", "password": "p"}
+        ).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def published(self):
+        return [(e.type, e.data) for e in self.broker.since(0)]
+
+    def test_writes_publish_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(reverse("post-list"), {"content": "new"}, format="json")
+        self.assertEqual(self.published()[-1], ("post-created", {"post": res.data["id"], "author": self.alice.id}))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("post-react", args=[self.post.id]), {"type": "mandela"}, format="json")
+        kind, data = self.published()[-1]
+        self.assertEqual(kind, "reaction-count-changed")
+        self.assertEqual((data["post"], data["reaction_counts"]["mandela"]), (self.post.id, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(reverse("comment-list"), {"post": self.post.id, "content": "hi"}, format="json")
+        self.assertEqual(
+            self.published()[-1],
+            ("comment-added", {"post": self.post.id, "comment": res.data["id"], "parent": None,
+                               "comments_count": {"total": 1, "top_level": 1}}),
+        )
+
+    def test_bounded_log(self):
+        for i in range(5):
+            self.broker.publish("test", {"n": i})
+        self.assertEqual([e.id for e in self.broker.since(2)], [3, 4, 5])
+        self.assertIsNone(self.broker.since(1))  # event 2 already left the log
+        self.assertEqual(self.broker.since(5), [])
+        self.assertIsNone(self.broker.since(9))  # an id from another run
+
+    @override_settings(EVENTS_BROKER="api.events.CacheBroker")
+    def test_cache_broker(self):
+        broker = events.get_broker()
+        broker.cache.clear()
+        for i in range(5):
+            broker.publish("test", {"n": i})
+        self.assertEqual([e.data["n"] for e in broker.since(2)], [2, 3, 4])
+        self.assertIsNone(broker.since(1))
+        broker.cache.delete(broker.key(4))  # evicted in the middle of the log
+        self.assertIsNone(broker.since(3))
+
+    def test_stream_requires_asgi(self):
+        self.assertEqual(self.client.get(reverse("stream")).status_code, 501)
+
+    async def test_stream_requires_token(self):
+        self.assertEqual((await self.async_client.get(reverse("stream"))).status_code, 401)
+        res = await self.async_client.get(reverse("stream"), {"token": "nope"})
+        self.assertEqual(res.status_code, 401)
+
+    async def next_chunk(self, body):
+        chunk = await asyncio.wait_for(anext(body), timeout=2)
+        return chunk.decode() if isinstance(chunk, bytes) else chunk
+
+    async def test_stream_pushes_events_and_heartbeats(self):
+        res = await self.async_client.get(reverse("stream"), {"token": self.token})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        body = aiter(res.streaming_content)
+        self.assertTrue((await self.next_chunk(body)).startswith("retry:"))
+        self.assertEqual(await self.next_chunk(body), ": ping\n\n")
+
+        await sync_to_async(self.broker.publish)("post-created", {"post": 7, "author": 1})
+        self.assertEqual(await self.next_chunk(body), 'id: 1\nevent: post-created\ndata: {"post":7,"author":1}\n\n')
+        await body.aclose()
+
+    async def test_stream_resumes_after_last_event_id(self):
+        for i in range(4):
+            self.broker.publish("test", {"n": i})
+        res = await self.async_client.get(
+            reverse("stream"), headers={"Authorization": f"Bearer {self.token}", "Last-Event-ID": "2"}
+        )
+        body = aiter(res.streaming_content)
+        await self.next_chunk(body)
+        chunk = await self.next_chunk(body)
+        self.assertEqual([line for line in chunk.splitlines() if line.startswith("id:")], ["id: 3", "id: 4"])
+        await body.aclose()
+
+        # Further behind than the log holds: the client is told to refetch
+        res = await self.async_client.get(reverse("stream"), {"token": self.token, "last_event_id": "0"})
+        body = aiter(res.streaming_content)
+        await self.next_chunk(body)
+        self.assertEqual(await self.next_chunk(body), "id: 4\nevent: reset\ndata: {}\n\n")
+        await body.aclose()
@@ -0,0 +1,96 @@
+# What it checks:
+# The feed is keyset-paginated: following `next` walks every post exactly once, newest first.
+# No COUNT(*) query is issued for a feed page.
+# The ?author=<id> filter (profile pages) is paginated the same way.
+# A feed page costs a fixed number of queries whatever its size (my_reaction is batched).
+# ?fields= trims the payload and skips the joins/prefetches; ?expand= collapses nested authors to ids.
+
+
+# backend/api/tests/test_feed.py
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from api.models import Post, Reaction
+
+User = get_user_model()
+
+
+class TestFeedPagination(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username="alice", password="p", role="student")
+        self.bob = User.objects.create_user(username="bob", password="p", role="student")
+        for i in range(7):
+            Post.objects.create(author=self.alice if i % 2 else self.bob, content=f"post {i}")
+
+        tok = reverse("token_obtain_pair")
+        token = self.client.post(tok, {"username": "alice", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def walk(self, url):
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 200, res.content)
+            self.assertNotIn("count", res.data)
+            ids += [p["id"] for p in res.data["results"]]
+            url = res.data["next"]
+        return ids
+
+    def test_cursor_walks_whole_feed_newest_first(self):
+        ids = self.walk(reverse("post-list") + "?page_size=3")
+        expected = list(Post.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_author_filter_is_paginated(self):
+        url = reverse("post-list") + f"?author={self.alice.id}&page_size=2"
+        ids = self.walk(url)
+        expected = list(
+            Post.objects.filter(author=self.alice).order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_no_count_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("post-list"))
+        self.assertFalse(any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries))
+
+    def test_invalid_cursor(self):
+        res = self.client.get(reverse("post-list") + "?cursor=garbage")
+        self.assertEqual(res.status_code, 404)
+
+    def test_fixed_query_count_regardless_of_page_size(self):
+        for post in Post.objects.all():
+            Reaction.objects.create(user=self.alice, post=post, type="einstein")
+            Reaction.objects.create(user=self.bob, post=post, type="mandela")
+
+        # posts + images (the user comes from the auth cache); reactions are counted, not loaded
+        self.client.get(reverse("post-list"))
+        for size in (2, 7):
+            with self.assertNumQueries(2):
+                res = self.client.get(reverse("post-list") + f"?page_size={size}")
+            self.assertEqual(len(res.data["results"]), size)
+            self.assertTrue(all(p["my_reaction"] == "einstein" for p in res.data["results"]))
+
+    def test_my_reaction_on_detail(self):
+        post = Post.objects.first()
+        Reaction.objects.create(user=self.alice, post=post, type="davinci")
+        res = self.client.get(reverse("post-detail", args=[post.id]))
+        self.assertEqual(res.data["my_reaction"], "davinci")
+
+    def test_sparse_fields_prune_queries(self):
+        # auth user + posts only: no author join, no images prefetch, no my_reaction subquery
+        with self.assertNumQueries(2) as ctx:
+            res = self.client.get(reverse("post-list") + "?fields=id,content,created_at")
+        self.assertEqual(set(res.data["results"][0]), {"id", "content", "created_at"})
+        self.assertNotIn("JOIN", ctx.captured_queries[-1]["sql"].upper())
+
+    def test_expand_collapses_author(self):
+        res = self.client.get(reverse("post-list") + "?fields=id,author&expand=")
+        post = Post.objects.get(pk=res.data["results"][0]["id"])
+        self.assertEqual(res.data["results"][0]["author"], post.author_id)
+
+        res = self.client.get(reverse("post-list") + "?fields=id,author&expand=author")
+        self.assertIn("username", res.data["results"][0]["author"])
@@ -0,0 +1,96 @@
+# What it checks:
+# `manage.py gc_media` deletes files under avatars/, covers/ and posts/ that no row references,
+# including renditions, and keeps referenced originals and renditions.
+# Files younger than --min-age are kept (uploads or jobs still in flight).
+# Abandoned upload spill files in the staging directory go by the same rule.
+# Candidates are checked against the rows again before deletion (references added after the scan started).
+# --dry-run only reports.
+
+
+# backend/api/tests/test_gc_media.py
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+
+from api.management.commands.gc_media import Command as GcMedia
+from api.models import Post, PostImage
+
+User = get_user_model()
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TestGcMedia(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def touch(self, name, age=86400):
+        path = os.path.join(MEDIA_ROOT, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"x" * 10)
+        then = time.time() - age
+        os.utime(path, (then, then))
+        return name
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(MEDIA_ROOT, name))
+
+    def setUp(self):
+        alice = User.objects.create_user(username="alice", password="p")
+        alice.avatar = self.touch("avatars/ab/ab12.jpg")
+        alice.avatar_renditions = {"thumb": {"name": self.touch("avatars/renditions/cd/cd34.webp"), "width": 1, "height": 1}}
+        alice.save()
+        post = Post.objects.create(author=alice, content="x")
+        PostImage.objects.create(
+            post=post, image=self.touch("posts/ef/ef56.jpg"), status="ready",
+            renditions={"feed": {"name": self.touch("posts/renditions/01/0123.webp"), "width": 1, "height": 1}},
+        )
+        self.kept = ["avatars/ab/ab12.jpg", "avatars/renditions/cd/cd34.webp", "posts/ef/ef56.jpg",
+                     "posts/renditions/01/0123.webp"]
+        self.orphans = [self.touch("avatars/old.jpg"), self.touch("covers/99/9999.jpg"),
+                        self.touch("posts/renditions/77/7777.webp")]
+        self.young = self.touch("posts/88/8888.jpg", age=0)
+
+    def test_dry_run_reports_only(self):
+        out = StringIO()
+        call_command("gc_media", "--dry-run", stdout=out)
+        self.assertIn("would delete 3 orphan(s)", out.getvalue())
+        self.assertTrue(all(self.exists(n) for n in self.orphans))
+
+    def test_deletes_orphans_only(self):
+        out = StringIO()
+        call_command("gc_media", "--batch-size=2", stdout=out)
+        self.assertIn("deleted 3 orphan(s)", out.getvalue())
+        self.assertFalse(any(self.exists(n) for n in self.orphans))
+        self.assertTrue(all(self.exists(n) for n in self.kept))
+        self.assertTrue(self.exists(self.young))
+        self.assertFalse(os.path.isdir(os.path.join(MEDIA_ROOT, "covers/99")))
+        self.assertTrue(os.path.isdir(os.path.join(MEDIA_ROOT, "covers")))
+
+    def test_rechecks_rows_before_deleting(self):
+        # A snapshot taken before the uploads that now point at these files
+        with mock.patch.object(GcMedia, "referenced_names", return_value=set()):
+            call_command("gc_media", "avatars", "posts", stdout=StringIO())
+        self.assertTrue(self.exists("avatars/ab/ab12.jpg"))
+        self.assertTrue(self.exists("posts/ef/ef56.jpg"))
+        self.assertFalse(self.exists("avatars/old.jpg"))
+
+    def test_sweeps_abandoned_spill_files(self):
+        abandoned = self.touch(".uploads/.upload-abandoned")
+        in_flight = self.touch(".uploads/.upload-in-flight", age=0)
+        call_command("gc_media", stdout=StringIO())
+        self.assertFalse(self.exists(abandoned))
+        self.assertTrue(self.exists(in_flight))
+        self.assertTrue(os.path.isdir(os.path.join(MEDIA_ROOT, ".uploads")))
@@ -0,0 +1,183 @@
+# What it checks:
+# Uploading a post image stores thumb/feed/full renditions, never upscaled, oriented by EXIF and without metadata.
+# The post image payload exposes the rendition URLs and a srcset; the original URL is unchanged.
+# Avatar uploads get renditions too, and nested authors use the avatar thumbnail.
+# Uploads that are not a JPEG, PNG, GIF or WebP image (HTML, SVG, garbage) are rejected with 400;
+# accepted ones are stored under their real type's extension, whatever the client named them.
+# With the process pool, the upload returns while the image is "processing" and the job fills it in.
+# A pool whose child died is replaced; if no pool takes the job, the image is marked "failed", not a 500.
+
+
+# backend/api/tests/test_images.py
+import os
+import shutil
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from PIL import Image
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from api import jobs
+from api.models import Post, PostImage
+
+User = get_user_model()
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg(width, height, orientation=None, name="photo.jpg"):
+    exif = Image.Exif()
+    exif[0x010E] = "secret description"  # ImageDescription
+    if orientation:
+        exif[0x0112] = orientation
+    buf = BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buf, "JPEG", exif=exif)
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/jpeg")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITION_FORMAT="WEBP", IMAGE_PROCESSING="sync")
+class TestImageRenditions(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username="alice", password="p", role="student")
+        self.post = Post.objects.create(author=self.alice, content="pics")
+        tok = reverse("token_obtain_pair")
+        token = self.client.post(tok, {"username": "alice", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def upload(self, file):
+        return self.client.post(
+            reverse("post-upload-image", args=[self.post.id]), {"image": file}, format="multipart"
+        )
+
+    def open_rendition(self, entry):
+        with default_storage.open(entry["name"]) as f:
+            img = Image.open(f)
+            img.load()
+        return img
+
+    def test_post_image_renditions(self):
+        res = self.upload(jpeg(2000, 1000))
+        self.assertEqual(res.status_code, 201, res.content)
+
+        self.assertEqual(res.data["status"], "ready")
+        img = PostImage.objects.get(pk=res.data["id"])
+        sizes = {name: (r["width"], r["height"]) for name, r in img.renditions.items()}
+        self.assertEqual(sizes, {"thumb": (160, 80), "feed": (720, 360), "full": (1600, 800)})
+
+        full = self.open_rendition(img.renditions["full"])
+        self.assertEqual(full.format, "WEBP")
+        self.assertEqual(len(full.getexif()), 0)
+
+        self.assertTrue(res.data["image"].endswith(img.image.url))
+        self.assertEqual(set(res.data["renditions"]), {"thumb", "feed", "full"})
+        self.assertTrue(res.data["renditions"]["feed"].startswith("http://testserver/media/posts/renditions/"))
+        self.assertEqual(
+            [part.split()[-1] for part in res.data["srcset"].split(", ")], ["160w", "720w", "1600w"]
+        )
+
+        feed = self.client.get(reverse("post-detail", args=[self.post.id])).data
+        self.assertEqual(feed["images"][0]["srcset"], res.data["srcset"])
+
+    def test_exif_orientation_applied_and_small_images_not_upscaled(self):
+        # Orientation 6: stored landscape, displayed portrait
+        res = self.upload(jpeg(300, 100, orientation=6))
+        img = PostImage.objects.get(pk=res.data["id"])
+        self.assertEqual((img.renditions["thumb"]["width"], img.renditions["thumb"]["height"]), (53, 160))
+        for name in ("feed", "full"):
+            self.assertEqual((img.renditions[name]["width"], img.renditions[name]["height"]), (100, 300))
+
+    def test_avatar_renditions_and_nested_thumbnail(self):
+        res = self.client.post(
+            reverse("user-avatar", args=[self.alice.id]), {"avatar": jpeg(400, 400, name="me.jpg")},
+            format="multipart",
+        )
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(set(res.data["avatar_renditions"]), {"thumb", "feed", "full"})
+
+        post = self.client.get(reverse("post-detail", args=[self.post.id])).data
+        self.assertEqual(post["author"]["avatar"], res.data["avatar_renditions"]["thumb"])
+
+    def test_non_images_rejected(self):
+        for name, data in [
+            ("evil.html", b"<script>alert(1)</script>"),
+            ("notes.jpg", b"not an image"),
+            ("logo.svg", b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>'),
+        ]:
+            res = self.upload(SimpleUploadedFile(name, data, content_type="image/jpeg"))
+            self.assertEqual(res.status_code, 400, name)
+            self.assertIn("images", res.data)
+        res = self.client.post(
+            reverse("user-avatar", args=[self.alice.id]),
+            {"avatar": SimpleUploadedFile("evil.html", b"<script>alert(1)</script>")}, format="multipart",
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(PostImage.objects.exists())
+        self.alice.refresh_from_db()
+        self.assertFalse(self.alice.avatar)
+
+    def test_stored_under_real_extension(self):
+        buf = BytesIO()
+        Image.new("RGB", (10, 10)).save(buf, "PNG")
+        res = self.upload(SimpleUploadedFile("photo.html", buf.getvalue(), content_type="text/html"))
+        self.assertEqual(res.status_code, 201, res.content)
+        self.assertTrue(PostImage.objects.get(pk=res.data["id"]).image.name.endswith(".png"))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITION_FORMAT="WEBP", IMAGE_PROCESSING="pool")
+class TestBackgroundProcessing(APITransactionTestCase):
+    def setUp(self):
+        alice = User.objects.create_user(username="alice", password="p", role="student")
+        self.post = Post.objects.create(author=alice, content="pics")
+        token = self.client.post(reverse("token_obtain_pair"), {"username": "alice", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def upload(self):
+        return self.client.post(
+            reverse("post-upload-image", args=[self.post.id]), {"image": jpeg(1000, 500)}, format="multipart"
+        )
+
+    def test_upload_returns_before_renditions_exist(self):
+        post = self.post
+        res = self.upload()
+        self.assertEqual(res.status_code, 201, res.content)
+        self.assertEqual((res.data["status"], res.data["renditions"]), ("processing", {}))
+        self.assertTrue(res.data["image"].endswith(".jpg"))
+
+        self.assertTrue(jobs.wait(timeout=30))
+        img = PostImage.objects.get(pk=res.data["id"])
+        self.assertEqual(img.status, "ready")
+        self.assertEqual(img.renditions["feed"]["width"], 720)
+
+        data = self.client.get(reverse("post-detail", args=[post.id])).data
+        self.assertEqual(data["images"][0]["status"], "ready")
+        self.assertIn("720w", data["images"][0]["srcset"])
+
+    def test_dead_pool_child(self):
+        crashed = jobs._get_executor().submit(os._exit, 1)  # a child killed mid-job
+        self.assertIsInstance(crashed.exception(timeout=30), BrokenProcessPool)
+
+        res = self.upload()
+        self.assertEqual(res.status_code, 201, res.content)
+        self.assertTrue(jobs.wait(timeout=30))
+        self.assertEqual(PostImage.objects.get(pk=res.data["id"]).status, "ready")
+
+    def test_no_pool_marks_failed(self):
+        broken = mock.Mock(**{"submit.side_effect": BrokenProcessPool()})
+        with mock.patch.object(jobs, "_get_executor", return_value=broken):
+            res = self.upload()
+        self.assertEqual(res.status_code, 201, res.content)
+        self.assertTrue(jobs.wait(timeout=0))
+        self.assertEqual(PostImage.objects.get(pk=res.data["id"]).status, "failed")
@@ -0,0 +1,106 @@
+# What it checks:
+# /media/ serves files with a strong ETag, Last-Modified and Accept-Ranges, and answers 304 on revalidation.
+# Content-addressed names are cached as immutable for a year; legacy names get MEDIA_CACHE_MAX_AGE.
+# Single byte ranges (including suffix ranges) return 206 with exactly those bytes; unsatisfiable ones 416.
+# A stale If-Range falls back to the full file; paths outside MEDIA_ROOT are 404.
+# Only raster image types are served inline; anything else is a sandboxed octet-stream attachment.
+
+
+# backend/api/tests/test_media.py
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+MEDIA_ROOT = tempfile.mkdtemp()
+DATA = bytes(range(256)) * 40
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_CACHE_MAX_AGE=600)
+class TestMediaServing(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.digest = hashlib.sha256(DATA).hexdigest()
+        cls.hashed = f"posts/{cls.digest[:2]}/{cls.digest}.jpg"
+        for name in (cls.hashed, "avatars/legacy.jpg", "posts/legacy.html", "posts/legacy.svg"):
+            path = os.path.join(MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(DATA)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def get(self, name, **headers):
+        res = self.client.get(f"/media/{name}", headers=headers)
+        body = b"".join(res.streaming_content) if res.streaming else res.content
+        res.close()
+        return res, body
+
+    def test_full_response_and_revalidation(self):
+        res, body = self.get(self.hashed)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(body, DATA)
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertEqual(res["Content-Length"], str(len(DATA)))
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertEqual(res["ETag"], f'"{self.digest}"')
+        self.assertIn("immutable", res["Cache-Control"])
+        self.assertIn("max-age=31536000", res["Cache-Control"])
+
+        res, body = self.get(self.hashed, if_none_match=res["ETag"])
+        self.assertEqual((res.status_code, body), (304, b""))
+
+    def test_legacy_names_get_short_cache(self):
+        res, _ = self.get("avatars/legacy.jpg")
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("max-age=600", res["Cache-Control"])
+        self.assertNotIn("immutable", res["Cache-Control"])
+
+        res, _ = self.get("avatars/legacy.jpg", if_modified_since=res["Last-Modified"])
+        self.assertEqual(res.status_code, 304)
+
+    def test_ranges(self):
+        res, body = self.get(self.hashed, range="bytes=100-199")
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(body, DATA[100:200])
+        self.assertEqual(res["Content-Range"], f"bytes 100-199/{len(DATA)}")
+        self.assertEqual(res["Content-Length"], "100")
+
+        res, body = self.get(self.hashed, range="bytes=-10")
+        self.assertEqual((res.status_code, body), (206, DATA[-10:]))
+
+        res, body = self.get(self.hashed, range="bytes=10000-")
+        self.assertEqual((res.status_code, body), (206, DATA[10000:]))
+
+        res, _ = self.get(self.hashed, range=f"bytes={len(DATA)}-")
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], f"bytes */{len(DATA)}")
+
+    def test_if_range(self):
+        res, body = self.get(self.hashed, range="bytes=0-9", if_range=f'"{self.digest}"')
+        self.assertEqual((res.status_code, body), (206, DATA[:10]))
+
+        res, body = self.get(self.hashed, range="bytes=0-9", if_range='"stale"')
+        self.assertEqual((res.status_code, body), (200, DATA))
+
+    def test_not_found(self):
+        self.assertEqual(self.client.get("/media/posts/missing.jpg").status_code, 404)
+        self.assertEqual(self.client.get("/media/../manage.py").status_code, 404)
+        self.assertEqual(self.client.get("/media/posts").status_code, 404)
+
+    def test_only_images_inline(self):
+        res, _ = self.get(self.hashed)
+        self.assertTrue(res["Content-Disposition"].startswith("inline"))
+        self.assertEqual(res["X-Content-Type-Options"], "nosniff")
+        for name in ("posts/legacy.html", "posts/legacy.svg"):
+            res, body = self.get(name)
+            self.assertEqual((res.status_code, body), (200, DATA))
+            self.assertEqual(res["Content-Type"], "application/octet-stream")
+            self.assertEqual(res["Content-Disposition"], "attachment")
+            self.assertEqual(res["Content-Security-Policy"], "default-src 'none'; sandbox")
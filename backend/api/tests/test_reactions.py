@@ -0,0 +1,185 @@
+# What it checks:
+# react/unreact keep the denormalized reaction counters on Post in sync (create, switch, remove).
+# They answer a compact {reaction_counts, my_reaction} without re-serializing the post; ?full=1 restores that.
+# reconcile_reaction_counts repairs counters that drifted from api_reaction.
+# Posts no longer embed reaction rows; /api/posts/{id}/reactions/ lists who reacted, filterable by type.
+# /api/posts/react/bulk/ replays queued reactions (last one per post wins) and returns count deltas,
+# which stay right when a reaction row appears after the bulk request read the existing ones.
+
+
+# backend/api/tests/test_reactions.py
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from api.models import Post, Reaction
+from api.views import PostViewSet
+
+User = get_user_model()
+
+
+class TestReactionCounters(APITestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="p", role="teacher")
+        self.fan = User.objects.create_user(username="fan", password="p", role="student")
+        self.post = Post.objects.create(author=self.author, content="hello")
+
+        tok = reverse("token_obtain_pair")
+        token = self.client.post(tok, {"username": "fan", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def react(self, rtype):
+        return self.client.post(reverse("post-react", args=[self.post.id]), {"type": rtype}, format="json")
+
+    def test_react_switch_unreact(self):
+        res = self.react("einstein")
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(res.data["reaction_counts"]["einstein"], 1)
+        self.assertEqual(res.data["reaction_counts"]["total"], 1)
+
+        res = self.react("mandela")
+        self.assertEqual(res.data["reaction_counts"]["einstein"], 0)
+        self.assertEqual(res.data["reaction_counts"]["mandela"], 1)
+        self.assertEqual(res.data["reaction_counts"]["total"], 1)
+
+        # Same type again is a no-op
+        res = self.react("mandela")
+        self.assertEqual(res.data["reaction_counts"]["mandela"], 1)
+
+        res = self.client.post(reverse("post-unreact", args=[self.post.id]))
+        self.assertEqual(res.data["reaction_counts"]["total"], 0)
+        # Unreacting twice must not go negative
+        res = self.client.post(reverse("post-unreact", args=[self.post.id]))
+        self.assertEqual(res.data["reaction_counts"]["total"], 0)
+
+    def test_compact_response(self):
+        self.react("einstein")  # warm-up: authenticated user cache
+        url = reverse("post-react", args=[self.post.id])
+        # Savepoint, post, reaction, its update, counters, read-back, change log row, release
+        with self.assertNumQueries(8) as ctx:
+            res = self.client.post(url, {"type": "davinci"}, format="json")
+        self.assertEqual(set(res.data), {"reaction_counts", "my_reaction"})
+        self.assertEqual(res.data["my_reaction"], "davinci")
+        self.assertFalse(any("api_postimage" in q["sql"] or "JOIN" in q["sql"] for q in ctx.captured_queries))
+
+        res = self.client.post(reverse("post-unreact", args=[self.post.id]))
+        self.assertIsNone(res.data["my_reaction"])
+        self.assertEqual(res.data["reaction_counts"]["total"], 0)
+
+        res = self.client.post(url + "?full=1", {"type": "mandela"}, format="json")
+        self.assertEqual(res.data["id"], self.post.id)
+        self.assertEqual(res.data["my_reaction"], "mandela")
+        self.assertEqual(res.data["reaction_counts"]["mandela"], 1)
+        self.assertIn("images", res.data)
+
+    def test_reconcile_command(self):
+        Reaction.objects.create(user=self.fan, post=self.post, type="davinci")
+        Reaction.objects.create(user=self.author, post=self.post, type="davinci")
+        Post.objects.filter(pk=self.post.pk).update(einstein_count=5)
+
+        out = StringIO()
+        call_command("reconcile_reaction_counts", stdout=out)
+        self.assertIn("1 post(s)", out.getvalue())
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.davinci_count, 2)
+        self.assertEqual(self.post.einstein_count, 0)
+
+    def test_who_reacted_list(self):
+        Reaction.objects.create(user=self.fan, post=self.post, type="davinci")
+        Reaction.objects.create(user=self.author, post=self.post, type="einstein")
+
+        res = self.client.get(reverse("post-detail", args=[self.post.id]))
+        self.assertNotIn("reactions", res.data)
+
+        url = reverse("post-reactions", args=[self.post.id])
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual([r["user"]["username"] for r in res.data["results"]], ["author", "fan"])
+
+        res = self.client.get(url + "?type=davinci")
+        self.assertEqual([r["user"]["username"] for r in res.data["results"]], ["fan"])
+
+        res = self.client.get(url + "?type=nope")
+        self.assertEqual(res.status_code, 400)
+
+
+class TestBulkReactions(APITestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="p", role="teacher")
+        self.fan = User.objects.create_user(username="fan", password="p", role="student")
+        self.posts = [Post.objects.create(author=self.author, content=f"post {i}") for i in range(3)]
+        Reaction.objects.create(user=self.fan, post=self.posts[1], type="davinci")
+        Reaction.objects.create(user=self.fan, post=self.posts[2], type="mandela")
+        call_command("reconcile_reaction_counts", stdout=StringIO())
+
+        token = self.client.post(reverse("token_obtain_pair"), {"username": "fan", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def bulk(self, operations):
+        return self.client.post(reverse("post-bulk-react"), operations, format="json")
+
+    def test_bulk_apply(self):
+        a, b, c = (p.id for p in self.posts)
+        res = self.bulk([
+            {"post": a, "type": "shakespeare"},
+            {"post": a, "type": "einstein"},  # last one wins
+            {"post": b, "type": "einstein"},  # switch
+            {"post": c, "type": None},  # remove
+            {"post": 999, "type": "einstein"},
+        ])
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(res.data["missing"], [999])
+        results = {r["post"]: r for r in res.data["results"]}
+        self.assertEqual(results[a]["delta"], {"einstein": 1, "total": 1})
+        self.assertEqual(results[b]["delta"], {"davinci": -1, "einstein": 1, "total": 0})
+        self.assertEqual(results[c]["delta"], {"mandela": -1, "total": -1})
+        self.assertIsNone(results[c]["my_reaction"])
+
+        self.assertEqual(
+            dict(Reaction.objects.filter(user=self.fan).values_list("post_id", "type")),
+            {a: "einstein", b: "einstein"},
+        )
+        for post in self.posts:
+            post.refresh_from_db()
+        self.assertEqual([p.einstein_count for p in self.posts], [1, 1, 0])
+        self.assertEqual([p.davinci_count for p in self.posts], [0, 0, 0])
+        self.assertEqual(self.posts[2].mandela_count, 0)
+
+        # Replaying the same queue changes nothing
+        res = self.client.post(
+            reverse("post-bulk-react"), {"operations": [{"post": a, "type": "einstein"}]}, format="json"
+        )
+        self.assertEqual(res.data["results"], [{"post": a, "my_reaction": "einstein", "delta": {}}])
+
+    def test_row_inserted_after_read(self):
+        post = self.posts[0]
+        real = PostViewSet.current_reactions
+        stale = []
+
+        def current_reactions(view, user, post_ids):
+            if not stale:
+                # A concurrent react lands right after this read: row and counter
+                stale.append(real(view, user, post_ids))
+                Reaction.objects.create(user=self.fan, post=post, type="davinci")
+                call_command("reconcile_reaction_counts", stdout=StringIO())
+                return stale[0]
+            return real(view, user, post_ids)
+
+        with mock.patch.object(PostViewSet, "current_reactions", current_reactions):
+            res = self.bulk([{"post": post.id, "type": "einstein"}])
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(res.data["results"][0]["delta"], {"davinci": -1, "einstein": 1, "total": 0})
+        post.refresh_from_db()
+        self.assertEqual((post.davinci_count, post.einstein_count), (0, 1))
+        self.assertEqual(Reaction.objects.get(user=self.fan, post=post).type, "einstein")
+
+    def test_invalid_operations(self):
+        self.assertEqual(self.bulk([]).status_code, 400)
+        self.assertEqual(self.bulk([{"post": "x", "type": "einstein"}]).status_code, 400)
+        self.assertEqual(self.bulk([{"post": self.posts[0].id, "type": "nope"}]).status_code, 400)
+        self.assertFalse(Reaction.objects.filter(post=self.posts[0]).exists())
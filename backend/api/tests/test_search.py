@@ -0,0 +1,110 @@
+# What it checks:
+# /api/search/ finds posts by content and users by username/name/bio, every word as a prefix, ignoring accents.
+# Results are ranked (username matches beat bio matches) and keyset-paginated with `next`.
+# The index follows edits and deletes without any application code.
+# The admin changelists search through the same index.
+
+
+# backend/api/tests/test_search.py
+from django.contrib import admin
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from api import search
+from api.models import Post
+
+User = get_user_model()
+
+
+class TestSearch(APITestCase):
+    def setUp(self):
+        self.maria = User.objects.create_user(
+            username="maria", password="p", first_name="Maria", last_name="Silva", role="teacher"
+        )
+        self.joao = User.objects.create_user(username="joao", password="p", bio="Aluno da professora Maria")
+        self.posts = [
+            Post.objects.create(author=self.maria, content="Excursão ao museu de ciências amanhã"),
+            Post.objects.create(author=self.joao, content="Fotos da excursão"),
+            Post.objects.create(author=self.joao, content="Prova de matemática"),
+        ]
+        token = self.client.post(reverse("token_obtain_pair"), {"username": "maria", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def ids(self, res):
+        return [r["id"] for r in res.data["results"]]
+
+    def test_posts_prefix_and_accents(self):
+        res = self.client.get(reverse("search"), {"q": "excursao", "type": "posts"})
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(set(self.ids(res)), {self.posts[0].id, self.posts[1].id})
+        self.assertIn("reaction_counts", res.data["results"][0])
+
+        res = self.client.get(reverse("search"), {"q": "exc muse", "type": "posts"})
+        self.assertEqual(self.ids(res), [self.posts[0].id])
+
+    def test_users_ranked(self):
+        res = self.client.get(reverse("search"), {"q": "maria", "type": "users"})
+        self.assertEqual(self.ids(res), [self.maria.id, self.joao.id])
+        self.assertNotIn("email", res.data["results"][0])
+
+    def test_combined_sections(self):
+        res = self.client.get(reverse("search"), {"q": "maria"})
+        self.assertEqual(set(res.data), {"posts", "users"})
+        self.assertEqual(res.data["posts"]["results"], [])
+        self.assertEqual(len(res.data["users"]["results"]), 2)
+
+    def test_pagination(self):
+        for i in range(5):
+            Post.objects.create(author=self.joao, content=f"aviso {i}")
+        url = reverse("search") + "?q=aviso&type=posts&page_size=2"
+        seen = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 200)
+            seen += self.ids(res)
+            url = res.data["next"]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+        res = self.client.get(reverse("search"), {"q": "maria", "type": "users", "page_size": 1})
+        self.assertIn("type=users", res.data["next"])
+
+    def test_index_follows_writes(self):
+        post = self.posts[2]
+        post.content = "Prova de geografia"
+        post.save()
+        self.assertEqual(self.ids(self.client.get(reverse("search"), {"q": "geografia", "type": "posts"})), [post.id])
+        self.assertEqual(self.ids(self.client.get(reverse("search"), {"q": "matematica", "type": "posts"})), [])
+
+        Post.objects.filter(pk=post.pk).update(content="Prova de história")
+        self.assertEqual(self.ids(self.client.get(reverse("search"), {"q": "historia", "type": "posts"})), [post.id])
+
+        post.delete()
+        self.assertEqual(self.ids(self.client.get(reverse("search"), {"q": "historia", "type": "posts"})), [])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get(reverse("search"), {"q": "  ?! "}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("search"), {"q": "x", "type": "groups"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("search"), {"q": "x", "type": "posts", "cursor": "zz"}).status_code, 404)
+
+    def test_matching_ids_subquery(self):
+        self.assertEqual(
+            set(Post.objects.filter(id__in=search.matching_ids("posts", "excursão")).values_list("id", flat=True)),
+            {self.posts[0].id, self.posts[1].id},
+        )
+
+    def test_admin_changelist_uses_index(self):
+        post_admin, user_admin = admin.site._registry[Post], admin.site._registry[User]
+        found, _ = post_admin.get_search_results(None, Post.objects.all(), "museu")
+        self.assertEqual(list(found), [self.posts[0]])
+        # posts by matching authors too (as author__username did)
+        found, _ = post_admin.get_search_results(None, Post.objects.all(), "silva")
+        self.assertEqual(list(found), [self.posts[0]])
+
+        found, _ = user_admin.get_search_results(None, User.objects.all(), "silva")
+        self.assertEqual(list(found), [self.maria])
+        self.maria.email = "maria@example.com"
+        self.maria.save()
+        found, _ = user_admin.get_search_results(None, User.objects.all(), "MARIA@example.com")
+        self.assertEqual(list(found), [self.maria])
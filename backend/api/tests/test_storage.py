@@ -0,0 +1,176 @@
+# What it checks:
+# Uploads are named by content hash: the same bytes uploaded twice are stored once and share a name.
+# A duplicate post image reuses the renditions already generated for its twin.
+# Replacing an avatar leaves the old blob to gc_media, which deletes it only when no row references it.
+# Deduplicated uploads refresh the shared blob's mtime (gc_media's grace period).
+# `manage.py dedupe_media` moves legacy random-suffix duplicates onto one hashed blob.
+# Several images go up in one request (upload_image or post creation) and are inserted with one query;
+# uploads past FILE_UPLOAD_MAX_MEMORY_SIZE are staged on the media filesystem and renamed into place.
+
+
+# backend/api/tests/test_storage.py
+import hashlib
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from api.models import Post, PostImage
+from api.storage import content_addressed_storage as storage
+
+User = get_user_model()
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_bytes(color=(10, 120, 200)):
+    buf = BytesIO()
+    Image.new("RGB", (320, 200), color).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_PROCESSING="sync")
+class TestContentAddressedStorage(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username="alice", password="p", role="student")
+        self.bob = User.objects.create_user(username="bob", password="p", role="student")
+        self.post = Post.objects.create(author=self.alice, content="pics")
+        tok = reverse("token_obtain_pair")
+        token = self.client.post(tok, {"username": "alice", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def upload(self, data, name="photo.JPG"):
+        return self.client.post(
+            reverse("post-upload-image", args=[self.post.id]),
+            {"image": SimpleUploadedFile(name, data, content_type="image/jpeg")},
+            format="multipart",
+        )
+
+    def test_identical_uploads_share_one_blob(self):
+        data = jpeg_bytes()
+        first = PostImage.objects.get(pk=self.upload(data, "a.JPG").data["id"])
+        second = PostImage.objects.get(pk=self.upload(data, "b.jpg").data["id"])
+
+        digest = hashlib.sha256(data).hexdigest()
+        self.assertEqual(first.image.name, f"posts/{digest[:2]}/{digest}.jpg")
+        self.assertEqual(second.image.name, first.image.name)
+        self.assertEqual(second.renditions, first.renditions)
+        self.assertEqual(second.status, "ready")
+        self.assertEqual(os.listdir(os.path.join(MEDIA_ROOT, "posts", digest[:2])), [f"{digest}.jpg"])
+        self.assertEqual(PostImage.objects.filter(image=first.image.name).count(), 2)
+
+        other = PostImage.objects.get(pk=self.upload(jpeg_bytes((0, 0, 0))).data["id"])
+        self.assertNotEqual(other.image.name, first.image.name)
+
+    def upload_many(self, url, colors, **extra):
+        files = [SimpleUploadedFile(f"{i}.jpg", jpeg_bytes(c), content_type="image/jpeg") for i, c in enumerate(colors)]
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(url, {"images": files, **extra}, format="multipart")
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "api_postimage"')]
+        return res, len(inserts)
+
+    def test_several_images_in_one_request(self):
+        url = reverse("post-upload-image", args=[self.post.id])
+        res, inserts = self.upload_many(url, [(1, 1, 1), (2, 2, 2), (1, 1, 1)])
+        self.assertEqual(res.status_code, 201, res.content)
+        self.assertEqual(inserts, 1)
+        self.assertEqual(len(res.data), 3)
+        self.assertEqual([i["status"] for i in res.data], ["ready"] * 3)
+        names = list(self.post.images.order_by("id").values_list("image", flat=True))
+        self.assertEqual(names[0], names[2])
+
+        with override_settings(POST_MAX_IMAGES=2):
+            res, inserts = self.upload_many(url, [(1, 1, 1)] * 3)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(self.post.images.count(), 3)
+
+    def test_create_post_with_images(self):
+        res, inserts = self.upload_many(reverse("post-list"), [(7, 7, 7), (8, 8, 8)], content="field trip")
+        self.assertEqual(res.status_code, 201, res.content)
+        self.assertEqual(inserts, 1)
+        post = Post.objects.get(pk=res.data["id"])
+        self.assertEqual((post.content, post.images.count()), ("field trip", 2))
+        self.assertEqual(len(res.data["images"]), 2)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=1024)
+    def test_large_uploads_are_staged_then_renamed(self):
+        data = jpeg_bytes((9, 9, 9))
+        self.assertGreater(len(data), 1024)
+        image = PostImage.objects.get(pk=self.upload(data).data["id"])
+        digest = hashlib.sha256(data).hexdigest()
+        self.assertEqual(image.image.name, f"posts/{digest[:2]}/{digest}.jpg")
+        with storage.open(image.image.name) as f:
+            self.assertEqual(f.read(), data)
+        # Spilled next to the media, then moved (or dropped as a duplicate): nothing left behind
+        self.assertEqual(os.listdir(storage.staging_dir), [])
+        self.upload(data)
+        self.assertEqual(os.listdir(storage.staging_dir), [])
+
+    def test_replacing_avatar_releases_unreferenced_blob(self):
+        url = reverse("user-avatar", args=[self.alice.id])
+        shared = jpeg_bytes((1, 2, 3))
+        self.client.post(url, {"avatar": SimpleUploadedFile("a.jpg", shared)}, format="multipart")
+        self.alice.refresh_from_db()
+        shared_name = self.alice.avatar.name
+
+        # Bob uses the same picture: it must survive Alice replacing hers
+        self.bob.avatar = shared_name
+        self.bob.save(update_fields=["avatar"])
+        self.client.post(url, {"avatar": SimpleUploadedFile("b.jpg", jpeg_bytes((4, 5, 6)))}, format="multipart")
+        self.assertTrue(storage.exists(shared_name))
+
+        self.alice.refresh_from_db()
+        own_name = self.alice.avatar.name
+        self.client.post(url, {"avatar": SimpleUploadedFile("c.jpg", jpeg_bytes((7, 8, 9)))}, format="multipart")
+        # Never deleted inline (another upload may be deduping onto it): gc_media collects it
+        self.assertTrue(storage.exists(own_name))
+        call_command("gc_media", "--min-age=0", stdout=StringIO())
+        self.assertFalse(storage.exists(own_name))
+        self.assertTrue(storage.exists(shared_name))
+
+    def test_dedupe_hit_touches_blob(self):
+        data = jpeg_bytes((11, 22, 33))
+        name = PostImage.objects.get(pk=self.upload(data).data["id"]).image.name
+        long_ago = 1_000_000_000
+        os.utime(storage.path(name), (long_ago, long_ago))
+        self.upload(data)
+        # Fresh mtime: gc_media's grace period starts over for the new reference
+        self.assertGreater(os.path.getmtime(storage.path(name)), long_ago)
+
+    def test_dedupe_media_command(self):
+        data = jpeg_bytes((50, 60, 70))
+        legacy = []
+        os.makedirs(os.path.join(MEDIA_ROOT, "posts"), exist_ok=True)
+        for suffix in ("", "_lGhbskA", "_zWfpcIC"):
+            name = f"posts/eiffel{suffix}.jpg"
+            with open(os.path.join(MEDIA_ROOT, name), "wb") as f:
+                f.write(data)
+            legacy.append(PostImage.objects.create(post=self.post, image=name, status="ready"))
+
+        out = StringIO()
+        call_command("dedupe_media", stdout=out)
+        self.assertIn("3 file reference(s) moved", out.getvalue())
+        names = {img.image.name for img in PostImage.objects.filter(pk__in=[i.pk for i in legacy])}
+        digest = hashlib.sha256(data).hexdigest()
+        self.assertEqual(names, {f"posts/{digest[:2]}/{digest}.jpg"})
+
+        out = StringIO()
+        call_command("dedupe_media", stdout=out)
+        self.assertIn("0 file reference(s) moved", out.getvalue())
@@ -0,0 +1,124 @@
+# What it checks:
+# /api/sync/ without a token answers `reset` and the token to start from.
+# After a token it returns only what changed: posts and comments in their current state,
+# counter changes for posts that did not change otherwise, and tombstones for deletes.
+# Tokens past a young gap in the change ids (a transaction still in flight) are not handed out.
+# Bad tokens are rejected; tokens older than the pruned log get `reset`.
+
+
+# backend/api/tests/test_sync.py
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from api import changes
+from api.models import Change, Post
+
+User = get_user_model()
+
+
+class TestSync(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username="alice", password="p", role="teacher")
+        self.old_post = Post.objects.create(author=self.alice, content="before")
+        token = self.client.post(reverse("token_obtain_pair"), {"username": "alice", "password": "p"}).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def sync(self, since=None, status=200):
+        res = self.client.get(reverse("sync"), {} if since is None else {"since": since})
+        self.assertEqual(res.status_code, status, res.content)
+        return res.data
+
+    def test_deltas_since_token(self):
+        start = self.sync()
+        self.assertTrue(start["reset"])
+
+        post = self.client.post(reverse("post-list"), {"content": "new"}, format="json").data
+        comment = self.client.post(
+            reverse("comment-list"), {"post": post["id"], "content": "hi"}, format="json"
+        ).data
+        self.client.post(reverse("post-react", args=[post["id"]]), {"type": "mandela"}, format="json")
+        self.client.post(reverse("post-react", args=[self.old_post.id]), {"type": "einstein"}, format="json")
+
+        data = self.sync(start["next"])
+        self.assertFalse(data["reset"])
+        self.assertEqual([p["id"] for p in data["posts"]], [post["id"]])
+        self.assertEqual(data["posts"][0]["reaction_counts"]["mandela"], 1)
+        self.assertEqual(data["posts"][0]["comments_count"]["total"], 1)
+        self.assertEqual([(c["id"], c["content"]) for c in data["comments"]], [(comment["id"], "hi")])
+        self.assertNotIn("replies", data["comments"][0])
+        # The old post only had its counters move
+        self.assertEqual(
+            data["counts"],
+            [{"post": self.old_post.id, "reaction_counts": {"einstein": 1, "shakespeare": 0, "davinci": 0,
+                                                            "mandela": 0, "total": 1},
+              "comments_count": {"total": 0, "top_level": 0}, "my_reaction": "einstein"}],
+        )
+        self.assertEqual(data["deleted"], {"posts": [], "comments": []})
+
+        # Nothing new since
+        again = self.sync(data["next"])
+        self.assertEqual((again["next"], again["posts"], again["counts"]), (data["next"], [], []))
+
+    def test_tombstones(self):
+        post = Post.objects.create(author=self.alice, content="doomed")
+        comment = self.client.post(reverse("comment-list"), {"post": post.id, "content": "c"}, format="json").data
+        token = self.sync()["next"]
+
+        self.client.patch(reverse("comment-detail", args=[comment["id"]]), {"content": "edited"}, format="json")
+        self.client.delete(reverse("comment-detail", args=[comment["id"]]))
+        data = self.sync(token)
+        self.assertEqual(data["comments"], [])
+        self.assertEqual(data["deleted"]["comments"], [comment["id"]])
+        self.assertEqual(data["counts"][0]["comments_count"], {"total": 0, "top_level": 0})
+
+        self.client.delete(reverse("post-detail", args=[post.id]))
+        data = self.sync(data["next"])
+        self.assertEqual(data["deleted"], {"posts": [post.id], "comments": []})
+        self.assertEqual(data["counts"], [])
+
+    @override_settings(SYNC_MAX_CHANGES=2)
+    def test_has_more(self):
+        token = self.sync()["next"]
+        for i in range(3):
+            self.client.post(reverse("post-list"), {"content": f"p{i}"}, format="json")
+        first = self.sync(token)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(first["posts"]), 2)
+        second = self.sync(first["next"])
+        self.assertFalse(second["has_more"])
+        self.assertEqual(len(second["posts"]), 1)
+
+    def test_gap_in_flight(self):
+        self.client.patch(reverse("post-detail", args=[self.old_post.id]), {"content": "edited"}, format="json")
+        last = changes.current()
+        self.assertGreater(last, 0)
+        young = Change.objects.create(id=last + 2, kind=Change.Kinds.POST, object_id=self.old_post.id)
+        # last + 1 may still commit: neither the start token nor a read moves past it
+        self.assertEqual(changes.current(), last)
+        self.assertEqual(self.sync(last)["next"], last)
+
+        Change.objects.filter(pk=young.pk).update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(changes.current(), young.id)  # old enough: a rolled back transaction
+        self.assertEqual(self.sync(last)["next"], young.id)
+
+    def test_bad_and_stale_tokens(self):
+        self.sync("abc", status=400)
+        self.sync(-1, status=400)
+        self.assertTrue(self.sync(10**9)["reset"])
+
+        token = self.sync()["next"]
+        for i in range(3):
+            self.client.post(reverse("post-list"), {"content": f"p{i}"}, format="json")
+        Change.objects.update(created_at=timezone.now() - timedelta(days=60))
+        call_command("prune_changes", stdout=StringIO())
+        self.assertEqual(Change.objects.count(), 1)  # the newest row stays
+        data = self.sync(token)
+        self.assertTrue(data["reset"])
+        self.assertFalse(self.sync(data["next"])["reset"])
@@ -0,0 +1,105 @@
+# backend/api/uploads.py
+"""
+Streaming multipart uploads for post images.
+
+Django's default handlers keep every file under FILE_UPLOAD_MAX_MEMORY_SIZE in
+memory (so ten photos can mean ten buffers) and spill the rest to /tmp, from
+where ContentAddressedStorage has to copy and hash them again. Here:
+  - each file is hashed (SHA-256) as its chunks are parsed,
+  - files stay in memory only while the whole request's buffered bytes fit in
+    FILE_UPLOAD_MAX_MEMORY_SIZE; anything past that budget is written straight
+    to a staging file on the media filesystem (storage.staging_dir),
+  - ContentAddressedStorage uses the precomputed digest: a blob that already
+    exists is not written again, a staged file is renamed into place.
+
+Use StreamingMultiPartParser as a view's parser to enable it.
+"""
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework.parsers import MultiPartParser
+
+from .storage import content_addressed_storage
+
+
+class StagedUploadedFile(UploadedFile):
+    """An upload already written to the media filesystem, with its digest."""
+
+    def __init__(self, file, path, name, content_type, size, charset, sha256, content_type_extra=None):
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.path = path
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.path
+
+    def close(self):
+        try:
+            return self.file.close()
+        finally:
+            # Still here unless the storage moved it into place
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    def __init__(self, request=None):
+        super().__init__(request)
+        # Shared by every file of the request
+        self.memory_budget = settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.buffer = BytesIO()
+        self.staged = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        if self.staged is None and self.buffer.tell() + len(raw_data) > self.memory_budget:
+            self._spill()
+        (self.staged or self.buffer).write(raw_data)
+        return None  # consumed: no other handler sees the data
+
+    def _spill(self):
+        staging_dir = content_addressed_storage.staging_dir
+        os.makedirs(staging_dir, exist_ok=True)
+        fd, self.staged_path = tempfile.mkstemp(dir=staging_dir, prefix=".upload-")
+        self.staged = os.fdopen(fd, "w+b")
+        self.staged.write(self.buffer.getvalue())
+        self.buffer = None
+
+    def file_complete(self, file_size):
+        sha256 = self.digest.hexdigest()
+        if self.staged is None:
+            self.memory_budget -= file_size
+            self.buffer.seek(0)
+            upload = InMemoryUploadedFile(
+                self.buffer, self.field_name, self.file_name, self.content_type, file_size,
+                self.charset, self.content_type_extra,
+            )
+            upload.sha256 = sha256
+            return upload
+        self.staged.flush()
+        self.staged.seek(0)
+        return StagedUploadedFile(
+            self.staged, self.staged_path, self.file_name, self.content_type, file_size,
+            self.charset, sha256, self.content_type_extra,
+        )
+
+    def upload_interrupted(self):
+        if self.staged is not None:
+            self.staged.close()
+            os.remove(self.staged_path)
+
+
+class StreamingMultiPartParser(MultiPartParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context["request"]._request
+        request.upload_handlers = [StreamingUploadHandler(request)]
+        return super().parse(stream, media_type, parser_context)
@@ -1,9 +1,11 @@
 # backend/api/urls.py
-from django.urls import path
+from django.conf import settings
+from django.urls import path, re_path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from .views import UserViewSet, PostViewSet, CommentViewSet, me
+from . import async_views
+from .views import UserViewSet, PostViewSet, CommentViewSet, me, cache_stats, search, stream, sync
 
 router = DefaultRouter()
 # Basenames chosen so route names match your tests:
@@ -16,8 +18,24 @@ urlpatterns = [
     path("auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("me/", me, name="me"),
+    path("stats/cache/", cache_stats, name="cache_stats"),
+    path("search/", search, name="search"),
+    path("stream/", stream, name="stream"),
+    path("sync/", sync, name="sync"),
 ]
 
+# Same URLs and names as the DRF routes below, matched first (see api/async_views.py).
+# Only worth it under ASGI: a WSGI server runs async views through async_to_sync.
+async_read_urlpatterns = [
+    path("me/", async_views.me, name="me"),
+    path("posts/", async_views.post_list, name="post-list"),
+    # Numeric ids only, so list-level actions (posts/batch/ ...) still reach the router
+    re_path(r"^posts/(?P<pk>[0-9]+)/$", async_views.post_detail, name="post-detail"),
+    path("comments/", async_views.comment_list, name="comment-list"),
+]
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = async_read_urlpatterns + urlpatterns
+
 # Important: only append router.urls once. Do NOT also include("", include(router.urls))
 urlpatterns += router.urls
 
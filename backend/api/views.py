@@ -1,12 +1,25 @@
 # backend/api/views.py
 
+import posixpath
+from collections import defaultdict
+from datetime import datetime
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import FormParser, JSONParser
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny, SAFE_METHODS
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, OuterRef, Q, Subquery, Window
+from django.db.models.functions import Lower, RowNumber
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 
 
 
@@ -15,7 +28,19 @@ from django.db import transaction
 
 
 
+from . import cache as post_cache, changes, conditional, counters, events, images, jobs
+from .authentication import CachedJWTAuthentication
 from .permissions import CanManagePost, CanManageComment
+from . import search as search_index
+from .pagination import (
+    CommentPagination,
+    PostFeedPagination,
+    ReactionPagination,
+    SearchPagination,
+    UserDirectoryPagination,
+)
+from .storage import content_addressed_storage
+from .uploads import StreamingMultiPartParser
 
 from .models import Post, PostImage, Reaction, Comment
 from .serializers import (
@@ -23,7 +48,9 @@ from .serializers import (
     PostSerializer,
     PostImageSerializer,
     ReactionSerializer,
-    CommentSerializer
+    CommentSerializer,
+    UserMiniSerializer,
+    UserDirectorySerializer,
 )
 
 
@@ -31,20 +58,154 @@ from .serializers import (
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+def checked_image(file, field):
+    """
+    `file`, named with the extension of the image type Pillow found in it (the
+    storage keeps the upload's extension and /media/ serves by it); 400 unless
+    it is one of images.UPLOAD_FORMATS.
+    """
+    ext = images.upload_extension(file)
+    if ext is None:
+        raise ValidationError({field: f"{file.name}: not a JPEG, PNG, GIF or WebP image"})
+    file.name = f"{posixpath.splitext(file.name)[0] or 'image'}.{ext}"
+    return file
+
+
+class SparseFieldsMixin:
+    """
+    ?fields=id,content,created_at  -> only render these fields
+    ?expand=author                 -> nested objects to render in full (others become ids)
+    Only applies to reads. get_queryset uses `wants()` to skip joins/prefetches
+    for anything the serializer won't render.
     """
-    /api/users/           [GET public list, POST signup]
+    def _csv_param(self, name):
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        raw = request.query_params.get(name)
+        if raw is None:
+            return None
+        return {f.strip() for f in raw.split(",") if f.strip()}
+
+    def wants(self, field, expanded=False):
+        fields = self._csv_param("fields")
+        if fields is not None and field not in fields:
+            return False
+        if expanded:
+            expand = self._csv_param("expand")
+            return expand is None or field in expand
+        return True
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self._csv_param("fields"))
+        kwargs.setdefault("expand", self._csv_param("expand"))
+        return super().get_serializer(*args, **kwargs)
+
+
+class BatchMixin:
+    """
+    GET <list url>/batch/?ids=3,1,2 -> {"results": [...], "missing": [...]}
+    Resolves up to settings.BATCH_MAX_IDS ids with the viewset's own queryset
+    (one query plus its prefetches) and serializer, in request order. Ids that do
+    not exist or that the requester may not see are listed in `missing`.
+    """
+    @action(detail=False, methods=["get"])
+    def batch(self, request):
+        ids = self.batch_ids(request)
+        found = self.filter_queryset(self.get_queryset()).in_bulk(ids)
+        permissions = self.get_permissions()
+        visible = [
+            found[pk] for pk in ids
+            if pk in found and all(p.has_object_permission(request, self, found[pk]) for p in permissions)
+        ]
+        shown = {obj.pk for obj in visible}
+        serializer = self.get_serializer(visible, many=True)
+        return Response({"results": serializer.data, "missing": [pk for pk in ids if pk not in shown]})
+
+    def batch_ids(self, request):
+        raw = request.query_params.get("ids", "")
+        try:
+            ids = [int(part) for part in raw.split(",") if part.strip()]
+        except ValueError:
+            raise ValidationError({"ids": "comma-separated integer ids expected"})
+        ids = list(dict.fromkeys(ids))  # de-duplicated, order kept
+        if not ids:
+            raise ValidationError({"ids": "at least one id is required"})
+        if len(ids) > settings.BATCH_MAX_IDS:
+            raise ValidationError({"ids": f"at most {settings.BATCH_MAX_IDS} ids per request"})
+        return ids
+
+
+class UserViewSet(BatchMixin, SparseFieldsMixin, viewsets.ModelViewSet):
+    """
+    /api/users/           [GET public directory, POST signup]
     /api/users/{id}/      [GET public retrieve, PATCH/DELETE require auth/permissions]
     /api/users/{id}/avatar/  [POST/PATCH multipart: 'avatar' - self or teacher]
+    /api/users/batch/?ids=1,2,3  [GET public, several directory entries at once (see BatchMixin)]
+    Supports ?fields= (see SparseFieldsMixin).
+    The directory (list) is compact, alphabetical and keyset-paginated:
+      ?q=<prefix>   case-insensitive prefix of username, first or last name
+      ?role=<role>  student | teacher | parent
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = UserDirectoryPagination
     # default lookup is by 'pk' (id). Keep it that way to match the frontend.
 
+    # Columns read by UserDirectorySerializer
+    directory_columns = ("id", "username", "first_name", "last_name", "role", "avatar", "avatar_renditions")
+
+    def get_serializer_class(self):
+        # Public bulk reads get the directory shape: no email, bio or cover
+        if self.action in ("list", "batch"):
+            return UserDirectorySerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "batch":
+            return qs.only(*self.directory_columns)
+        if self.action != "list":
+            return qs
+        qs = qs.only(*self.directory_columns).annotate(username_key=Lower("username"))
+
+        role = self.request.query_params.get("role")
+        if role:
+            if role not in User.Roles.values:
+                raise ValidationError({"role": f"must be one of {sorted(User.Roles.values)}"})
+            qs = qs.filter(role=role)
+
+        query = self.request.query_params.get("q", "").strip()
+        if query:
+            # Ranges on the lower() expression indexes (LIKE would not use them)
+            match = Q()
+            for prefix in self.directory_prefixes(query, connections[qs.db].vendor):
+                upper = prefix + "\U0010ffff"
+                match |= (
+                    Q(username_key__gte=prefix, username_key__lt=upper)
+                    | Q(first_key__gte=prefix, first_key__lt=upper)
+                    | Q(last_key__gte=prefix, last_key__lt=upper)
+                )
+            qs = qs.alias(first_key=Lower("first_name"), last_key=Lower("last_name")).filter(match)
+        return qs
+
+    @staticmethod
+    def directory_prefixes(query, vendor):
+        """
+        The lower()-keyed prefixes `query` is looked up as. SQLite's lower() only
+        folds ASCII (lower('Álvaro') = 'Álvaro'), so there the query is folded the
+        same way and also tried with a capital initial, which is where accented
+        capitals are in names (á/Á -> both 'á...' and 'Á...').
+        """
+        if vendor != "sqlite":
+            return [query.lower()]
+        folded = "".join(c.lower() if c.isascii() else c for c in query)
+        return list(dict.fromkeys([folded, folded[0].upper() + folded[1:], query.lower()]))
+
     def get_permissions(self):
         # Signup (create) is public; list/retrieve are public so profiles are visible;
         # all other actions require authentication (and server-side checks per action).
-        if self.action in ["create", "list", "retrieve"]:
+        if self.action in ["create", "list", "retrieve", "batch"]:
             return [AllowAny()]
         return [IsAuthenticated()]
 
@@ -53,6 +214,23 @@ class UserViewSet(viewsets.ModelViewSet):
         ctx["request"] = self.request
         return ctx
     
+    def retrieve(self, request, *args, **kwargs):
+        if conditional.is_conditional(request):
+            # Revalidation costs one primary-key lookup of the version stamp
+            try:
+                stamp = User.objects.filter(pk=kwargs["pk"]).values_list("id", "version", "changed_at").first()
+            except (TypeError, ValueError):
+                stamp = None
+            if stamp:
+                response = conditional.not_modified(request, conditional.Validators(request, stamp, last_modified=stamp[2]))
+                if response is not None:
+                    return response
+
+        instance = self.get_object()
+        stamp = (instance.id, instance.version, instance.changed_at)
+        validators = conditional.Validators(request, stamp, last_modified=instance.changed_at)
+        return conditional.set_validators(Response(self.get_serializer(instance).data), validators)
+
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
         me = request.user
@@ -72,7 +250,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return super().partial_update(request, *args, **kwargs)
     
     
-    @action(detail=True, methods=["post", "patch"], parser_classes=[MultiPartParser, FormParser])
+    @action(detail=True, methods=["post", "patch"], parser_classes=[StreamingMultiPartParser, FormParser])
     def cover(self, request, pk=None):
         """
         Upload/replace cover image (multipart 'cover').
@@ -88,12 +266,18 @@ class UserViewSet(viewsets.ModelViewSet):
         file = request.FILES.get("cover")
         if not file:
             return Response({"detail": "cover file required"}, status=400)
+        file = checked_image(file, "cover")
 
+        previous = user_obj.cover.name
         user_obj.cover = file
-        user_obj.save(update_fields=["cover"])
+        # The old renditions no longer match; the original is served until the new ones are ready
+        user_obj.cover_renditions = {}
+        user_obj.save(update_fields=["cover", "cover_renditions"])
+        content_addressed_storage.release(previous)  # gc_media deletes it unless someone else uses it
+        jobs.process_user_image(user_obj, "cover")
         return Response(UserSerializer(user_obj, context={"request": request}).data, status=200)
 
-    @action(detail=True, methods=["post", "patch"], parser_classes=[MultiPartParser, FormParser])
+    @action(detail=True, methods=["post", "patch"], parser_classes=[StreamingMultiPartParser, FormParser])
     def avatar(self, request, pk=None):
         """
         Upload or replace user avatar (multipart field: 'avatar').
@@ -112,43 +296,65 @@ class UserViewSet(viewsets.ModelViewSet):
         file = request.FILES.get("avatar")
         if not file:
             return Response({"detail": "avatar file required"}, status=400)
+        file = checked_image(file, "avatar")
 
+        previous = user_obj.avatar.name
         user_obj.avatar = file
-        user_obj.save(update_fields=["avatar"])
+        # The old renditions no longer match; the original is served until the new ones are ready
+        user_obj.avatar_renditions = {}
+        user_obj.save(update_fields=["avatar", "avatar_renditions"])
+        content_addressed_storage.release(previous)  # gc_media deletes it unless someone else uses it
+        jobs.process_user_image(user_obj, "avatar")
         return Response(UserSerializer(user_obj, context={"request": request}).data, status=200)
 
 
 VALID_REACTIONS = {k for k, _ in Reaction.Types.choices}  # {'einstein','shakespeare','davinci','mandela'}
 
-class PostViewSet(viewsets.ModelViewSet):
+
+def with_my_reaction(queryset, user):
     """
-    /api/posts/                [GET list feed, POST create]
+    Resolve `user`'s reaction for every post in the same SELECT (read by
+    PostSerializer.get_my_reaction) instead of one query per post.
+    """
+    return queryset.annotate(
+        my_reaction_type=Subquery(Reaction.objects.filter(post=OuterRef("pk"), user_id=user.id).values("type")[:1])
+    )
+
+
+class PostViewSet(BatchMixin, SparseFieldsMixin, viewsets.ModelViewSet):
+    """
+    /api/posts/                [GET list feed, POST create (JSON, or multipart with 'images' files)]
     /api/posts/{id}/           [GET, PATCH, DELETE with permissions]
-    /api/posts/{id}/upload_image/  [POST multipart 'image' - author or teacher]
+    /api/posts/{id}/upload_image/  [POST multipart 'image' or several 'images' - author or teacher]
     /api/posts/{id}/react/     [POST {'type': 'einstein'|'shakespeare'|'davinci'|'mandela'}]
     /api/posts/{id}/unreact/   [POST remove reaction]
+                               (both answer {reaction_counts, my_reaction}; ?full=1 for the whole post)
+    /api/posts/{id}/reactions/ [GET who reacted, paginated; optional ?type=<reaction>]
+    /api/posts/batch/?ids=1,2,3 [GET several posts at once (see BatchMixin)]
+    /api/posts/react/bulk/     [POST queued reactions for many posts at once]
     Supports filter: /api/posts/?author=<user_id>
+    Feed is keyset-paginated: follow `next` (?cursor=<token>) for older posts.
+    Supports ?fields= / ?expand= (see SparseFieldsMixin).
     """
-    queryset = (
-        Post.objects
-        .select_related("author")
-        # Prefetch only the fields we use for counts/my_reaction for efficiency
-        .prefetch_related(
-            "images",
-            # Keep your ReactionSerializer happy; at minimum we need type and user_id
-            # If you have a custom ReactionSerializer that needs more, adjust fields.
-            "reactions",
-        )
-        .all()
-    )
+    # Joins/prefetches are added in get_queryset depending on requested fields.
+    # Reactions are not embedded in the feed (see PostViewSet.reactions).
+    queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticated, CanManagePost]
+    pagination_class = PostFeedPagination
+    parser_classes = [JSONParser, StreamingMultiPartParser, FormParser]
 
     def get_queryset(self):
         qs = super().get_queryset()
         author_id = self.request.query_params.get("author")
         if author_id:
             qs = qs.filter(author_id=author_id)
+        if self.wants("author", expanded=True):
+            qs = qs.select_related("author")
+        if self.wants("images"):
+            qs = qs.prefetch_related("images")
+        if self.wants("my_reaction"):
+            qs = with_my_reaction(qs, self.request.user)
         return qs
 
     def get_serializer_context(self):
@@ -156,28 +362,129 @@ class PostViewSet(viewsets.ModelViewSet):
         ctx["request"] = self.request
         return ctx
 
+    # changed_at has millisecond resolution on SQLite: keep the counters too (as api/cache.py does)
+    counter_columns = [*counters.REACTION_COUNTER_FIELDS, "comment_count", "root_comment_count"]
+
+    def version_columns(self):
+        """Columns that version what this request renders (see stamp())."""
+        columns = ["id", "changed_at", *self.counter_columns]
+        if self.wants("author", expanded=True):
+            columns += ["author__version", "author__changed_at"]
+        if self.wants("my_reaction"):
+            columns.append("my_reaction_type")
+        return columns
+
+    def stamp(self, post):
+        """version_columns() read from an already loaded post."""
+        row = [post.id, post.changed_at, *(getattr(post, f) for f in self.counter_columns)]
+        if self.wants("author", expanded=True):
+            row += [post.author.version, post.author.changed_at]
+        if self.wants("my_reaction"):
+            row.append(post.my_reaction_type)
+        return tuple(row)
+
+    def get_validators(self, rows, *extra):
+        last_modified = max((v for row in rows for v in row if isinstance(v, datetime)), default=None)
+        return conditional.Validators(self.request, rows, *extra, last_modified=last_modified)
+
+    def list(self, request, *args, **kwargs):
+        paginator = self.paginator
+        if conditional.is_conditional(request):
+            # Revalidation: one query over the page's version stamps
+            queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+            rows = list(paginator.window(queryset, request).values_list(*self.version_columns()))
+            validators = self.get_validators(rows[: paginator.page_size], len(rows) > paginator.page_size)
+            response = conditional.not_modified(request, validators)
+            if response is not None:
+                return response
+
+        response = super().list(request, *args, **kwargs)
+        rows = [self.stamp(post) for post in paginator.page]
+        return conditional.set_validators(response, self.get_validators(rows, paginator.has_next))
+
+    def retrieve(self, request, *args, **kwargs):
+        if conditional.is_conditional(request):
+            try:
+                queryset = self.get_queryset().filter(pk=kwargs["pk"]).prefetch_related(None)
+                rows = list(queryset.values_list(*self.version_columns()))
+            except (TypeError, ValueError):
+                rows = []
+            response = rows and conditional.not_modified(request, self.get_validators(rows))
+            if response:
+                return response
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return conditional.set_validators(Response(serializer.data), self.get_validators([self.stamp(instance)]))
+
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        # multipart creation may carry the post's photos too ("images" / "image" files)
+        files = self.image_files(self.request)
+        post = serializer.save(author=self.request.user)
+        self.add_images(post, files)
+        changes.record(changes.Kinds.POST, post.id)
+        events.publish("post-created", {"post": post.id, "author": post.author_id})
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        post = serializer.save()
+        changes.record(changes.Kinds.POST, post.id)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Its comments and reactions go with it: clients drop them on the post's tombstone
+        changes.record(changes.Kinds.POST, instance.pk, deleted=True)
+        instance.delete()
 
-    @action(detail=True, methods=["post"], parser_classes=[MultiPartParser, FormParser])
+    @action(detail=True, methods=["post"], parser_classes=[StreamingMultiPartParser, FormParser])
     def upload_image(self, request, pk=None):
+        """
+        'image': one file, answered with that image; 'images' (repeatable): several
+        files in one request, answered with the list.
+        """
         post = self.get_object()
         user = request.user
         if (post.author_id != user.id) and (getattr(user, "role", None) != "teacher"):
             return Response({"detail": "Not allowed."}, status=403)
 
-        file = request.FILES.get("image")
-        if not file:
+        files = self.image_files(request)
+        if not files:
             return Response({"detail": "image file required"}, status=400)
+        with transaction.atomic():
+            created = self.add_images(post, files)
+            # New images change the post's rendering: bump updated_at/changed_at
+            # (versions the fragment cache and the ETag)
+            post.save(update_fields=["updated_at", "changed_at"])
+            changes.record(changes.Kinds.POST, post.id)
+        serializer = PostImageSerializer(created, many=True, context={"request": request})
+        data = serializer.data if "images" in request.FILES else serializer.data[0]
+        return Response(data, status=201)
+
+    def image_files(self, request):
+        files = request.FILES.getlist("images") + request.FILES.getlist("image")
+        if len(files) > settings.POST_MAX_IMAGES:
+            raise ValidationError({"images": f"at most {settings.POST_MAX_IMAGES} images per request"})
+        return [checked_image(file, "images") for file in files]
 
-        img = PostImage.objects.create(post=post, image=file)
-        return Response(PostImageSerializer(img, context={"request": request}).data, status=201)
+    def add_images(self, post, files):
+        """Store `files` (deduplicated by content) and insert their PostImage rows in one query."""
+        created = []
+        for file in files:
+            img = PostImage(post=post)
+            img.image.save(file.name, file, save=False)
+            created.append(img)
+        PostImage.objects.bulk_create(created)
+        for img in created:
+            # Renditions are generated in the background (status "processing" until then)
+            jobs.process_post_image(img)
+        return created
 
   
     @action(detail=True, methods=["post"])
     @transaction.atomic
     def react(self, request, pk=None):
-        post = self.get_object()
+        post = self.reaction_target()
         rtype = (request.data.get("type") or "").strip().lower()
 
         if rtype not in VALID_REACTIONS:
@@ -186,29 +493,192 @@ class PostViewSet(viewsets.ModelViewSet):
                 status=400,
             )
 
-        # One reaction per user/post — update or create
-        Reaction.objects.update_or_create(
+        # One reaction per user/post — create, or switch the existing type.
+        # The post lock (reaction_target) keeps the counter delta consistent under concurrent clicks.
+        reaction, created = Reaction.objects.select_for_update().get_or_create(
             user=request.user, post=post, defaults={"type": rtype}
         )
+        old_type = None if created else reaction.type
+        if not created and old_type != rtype:
+            reaction.type = rtype
+            reaction.save(update_fields=["type"])
+        counters.reaction_changed(post.pk, old_type=old_type, new_type=rtype)
+        return self.reaction_response(post, rtype, changed=old_type != rtype)
 
-        # Return updated post with counts + my_reaction
-        data = PostSerializer(post, context={"request": request}).data
-        return Response(data, status=200)
-
-  
     @action(detail=True, methods=["post"])
     @transaction.atomic
     def unreact(self, request, pk=None):
-        post = self.get_object()
-        Reaction.objects.filter(user=request.user, post=post).delete()
+        post = self.reaction_target()
+        reaction = Reaction.objects.select_for_update().filter(user=request.user, post=post).first()
+        if reaction:
+            reaction.delete()
+            counters.reaction_changed(post.pk, old_type=reaction.type)
+        return self.reaction_response(post, None, changed=reaction is not None)
 
-        # Return updated post (so UI can refresh counts without extra GET)
-        data = PostSerializer(post, context={"request": request}).data
+    def wants_full_post(self):
+        return self.request.query_params.get("full") in ("1", "true")
+
+    def reaction_target(self):
+        """
+        The post react/unreact act on, locked (see lock_posts()). Unless ?full=1
+        asks for the whole post back, only its key columns are loaded (no author
+        join, images or my_reaction).
+        """
+        post = get_object_or_404(self.lock_posts(Post.objects.only("id", "author_id")), pk=self.kwargs["pk"])
+        self.check_object_permissions(self.request, post)
+        return self.get_object() if self.wants_full_post() else post
+
+    def lock_posts(self, queryset):
+        """
+        Row-lock the posts whose reactions are about to change. react, unreact and
+        bulk_react all take it first, so they run one at a time per post and the
+        reactions each one reads stay what it replaces (a lock on the reaction
+        rows alone misses rows that do not exist yet).
+        """
+        return queryset.select_for_update(of=("self",)).order_by("pk")
+
+    def reaction_response(self, post, my_reaction, changed):
+        """
+        {reaction_counts, my_reaction} read back from the counters (what the UI
+        updates after a click); ?full=1 returns the re-serialized post instead.
+        """
+        post.refresh_from_db(fields=[*counters.REACTION_COUNTER_FIELDS, "changed_at"])
+        if changed:
+            changes.record(changes.Kinds.COUNTS, post.pk)
+            self.publish_reaction_counts(post)
+        if not self.wants_full_post():
+            return Response({"reaction_counts": counters.reaction_counts(post), "my_reaction": my_reaction})
+        post.my_reaction_type = my_reaction
+        data = PostSerializer(post, context={"request": self.request}).data
         return Response(data, status=200)
-    
+
+    @action(detail=False, methods=["post"], url_path="react/bulk")
+    @transaction.atomic
+    def bulk_react(self, request):
+        """
+        POST /api/posts/react/bulk/  [{"post": 1, "type": "einstein"}, {"post": 2, "type": null}, ...]
+        (or {"operations": [...]}). Replays a client's queued reactions: `type: null`
+        removes the reaction, and the last operation per post wins. Returns only what
+        changed: {"results": [{"post", "my_reaction", "delta": {type: +-n}}], "missing": [...]}.
+        """
+        operations = request.data.get("operations") if isinstance(request.data, dict) else request.data
+        requested = self.bulk_reaction_operations(operations)
+        existing = set(self.lock_posts(Post.objects.filter(pk__in=requested)).values_list("id", flat=True))
+        wanted = {post_id: rtype for post_id, rtype in requested.items() if post_id in existing}
+        current = self.write_reactions(request.user, wanted)
+
+        deltas = counters.reaction_deltas(
+            (post_id, current.get(post_id), rtype) for post_id, rtype in wanted.items()
+        )
+        counters.apply_reaction_deltas(deltas)
+        changed = [post_id for post_id, delta in deltas.items() if delta]
+        changes.record(changes.Kinds.COUNTS, *changed)
+        for post in Post.objects.filter(pk__in=changed).only("id", *counters.REACTION_COUNTER_FIELDS):
+            self.publish_reaction_counts(post)
+
+        results = []
+        for post_id, rtype in wanted.items():
+            delta = deltas.get(post_id, {})
+            if delta:
+                delta["total"] = sum(delta.values())
+            results.append({"post": post_id, "my_reaction": rtype, "delta": delta})
+        missing = [post_id for post_id in requested if post_id not in existing]
+        return Response({"results": results, "missing": missing}, status=200)
+
+    def current_reactions(self, user, post_ids):
+        """{post_id: type} of `user`'s reactions on `post_ids`, row-locked."""
+        return dict(
+            Reaction.objects.select_for_update().filter(user=user, post_id__in=post_ids).values_list("post_id", "type")
+        )
+
+    def write_reactions(self, user, wanted, attempts=3):
+        """
+        Make `user`'s reactions on the posts in `wanted` ({post_id: type or None})
+        match it; returns the {post_id: type} they replaced. New rows are plain
+        INSERTs rather than upserts: should one conflict with a row this request
+        did not see, it fails and the reactions are read again, instead of an
+        upsert silently overwriting a type the counters are not told about.
+        """
+        for attempt in range(attempts):
+            current = self.current_reactions(user, wanted)
+            inserts = [
+                Reaction(user=user, post_id=post_id, type=rtype)
+                for post_id, rtype in wanted.items()
+                if rtype and post_id not in current
+            ]
+            try:
+                with transaction.atomic():
+                    Reaction.objects.bulk_create(inserts)
+                break
+            except IntegrityError:
+                if attempt == attempts - 1:
+                    raise
+
+        switches = defaultdict(list)
+        for post_id, rtype in wanted.items():
+            if rtype and post_id in current and current[post_id] != rtype:
+                switches[rtype].append(post_id)
+        for rtype, post_ids in switches.items():
+            Reaction.objects.filter(user=user, post_id__in=post_ids).update(type=rtype)
+        removals = [post_id for post_id, rtype in wanted.items() if rtype is None and post_id in current]
+        if removals:
+            Reaction.objects.filter(user=user, post_id__in=removals).delete()
+        return current
+
+    def publish_reaction_counts(self, post):
+        events.publish("reaction-count-changed", {"post": post.pk, "reaction_counts": counters.reaction_counts(post)})
+
+    def bulk_reaction_operations(self, operations):
+        """{post_id: type or None} from the request's operations, last one per post winning."""
+        if not isinstance(operations, list) or not operations:
+            raise ValidationError({"operations": "a non-empty list of {post, type} objects is expected"})
+        if len(operations) > settings.BULK_REACTIONS_MAX:
+            raise ValidationError({"operations": f"at most {settings.BULK_REACTIONS_MAX} operations per request"})
+        wanted = {}
+        for i, op in enumerate(operations):
+            if not isinstance(op, dict):
+                raise ValidationError({"operations": f"item {i}: expected an object"})
+            try:
+                post_id = int(op.get("post"))
+            except (TypeError, ValueError):
+                raise ValidationError({"operations": f"item {i}: 'post' must be an integer id"})
+            rtype = op.get("type")
+            rtype = rtype.strip().lower() if isinstance(rtype, str) else rtype
+            if rtype is not None and rtype not in VALID_REACTIONS:
+                raise ValidationError(
+                    {"operations": f"item {i}: type must be null or one of {sorted(VALID_REACTIONS)}"}
+                )
+            wanted.pop(post_id, None)  # re-insert so the dict follows the last operation's order
+            wanted[post_id] = rtype
+        return wanted
+
+    @action(detail=True, methods=["get"])
+    def reactions(self, request, pk=None):
+        post = self.get_object()
+        qs = Reaction.objects.filter(post=post)
+        if self.wants("user", expanded=True):
+            qs = qs.select_related("user")
+
+        rtype = (request.query_params.get("type") or "").strip().lower()
+        if rtype:
+            if rtype not in VALID_REACTIONS:
+                return Response(
+                    {"detail": f"Invalid reaction type. Must be one of {sorted(VALID_REACTIONS)}."},
+                    status=400,
+                )
+            qs = qs.filter(type=rtype)
+
+        paginator = ReactionPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        data = ReactionSerializer(
+            page, many=True, context={"request": request},
+            fields=self._csv_param("fields"), expand=self._csv_param("expand"),
+        ).data
+        return paginator.get_paginated_response(data)
+
     def get_permissions(self):
         # Actions that any authenticated user can do
-        open_actions = {"list", "retrieve", "react", "unreact"}
+        open_actions = {"list", "retrieve", "batch", "react", "unreact", "bulk_react", "reactions"}
         # Actions restricted to the owner/teacher (your custom CanManagePost)
         restricted_actions = {"create", "update", "partial_update", "destroy", "upload_image"}
 
@@ -222,31 +692,153 @@ class PostViewSet(viewsets.ModelViewSet):
 
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     """
     /api/comments/?post=<post_id>  [GET list for a post]
     /api/comments/                 [POST create {post, content, parent?}]
     /api/comments/{id}/            [GET, PATCH, DELETE]
+    /api/comments/{id}/replies/    [GET direct replies, paginated ("load more replies")]
+    Lists are keyset-paginated oldest first (follow `next`).
+    Replies are nested to any depth (capped by settings.COMMENT_MAX_DEPTH, or ?depth=<n>),
+    at most settings.COMMENT_INLINE_REPLIES per comment; `replies_count` and
+    `replies_next` tell the client how many more exist and where to get them.
+    The whole tree under a page of comments is loaded with a single query.
+    Supports ?fields= / ?expand= (see SparseFieldsMixin).
     """
-    queryset = Comment.objects.select_related("author", "post", "parent").prefetch_related("replies__author").all()
+    # post/parent are rendered as ids (no join needed); the author join is added
+    # in get_queryset depending on requested fields.
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated, CanManageComment]
+    pagination_class = CommentPagination
 
     def get_queryset(self):
         qs = super().get_queryset()
         post_id = self.request.query_params.get("post")
         if post_id:
             qs = qs.filter(post_id=post_id, parent__isnull=True)  # only roots; replies come nested
+        if self.wants("author", expanded=True):
+            qs = qs.select_related("author")
         return qs.order_by("created_at")
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["request"] = self.request
+        ctx["reply_map"] = getattr(self, "reply_map", None)
+        ctx["max_depth"] = self.get_max_depth()
         return ctx
 
+    def get_max_depth(self):
+        limit = settings.COMMENT_MAX_DEPTH
+        try:
+            return max(0, min(int(self.request.query_params["depth"]), limit))
+        except (KeyError, ValueError):
+            return limit
+
+    def build_reply_map(self, comments):
+        """
+        The first COMMENT_INLINE_REPLIES replies of every comment under `comments`,
+        down to the max depth, fetched with one query over their threads
+        (ROW_NUMBER() per parent) and grouped by parent id.
+        """
+        queryset = self.reply_queryset(comments)
+        return self.group_replies(queryset if queryset is not None else [])
+
+    def group_replies(self, replies):
+        reply_map = defaultdict(list)
+        for reply in replies:
+            reply_map[reply.parent_id].append(reply)
+        return reply_map
+
+    def reply_queryset(self, comments):
+        """The replies build_reply_map() inlines under `comments`, or None if there are none to load."""
+        max_depth = self.get_max_depth()
+        if not comments or not max_depth or not self.wants("replies"):
+            return None
+
+        threads = {c.thread_id for c in comments}
+        deepest = max(c.depth for c in comments) + max_depth
+        qs = (
+            Comment.objects
+            .filter(root_id__in=threads, depth__lte=deepest)
+            .annotate(sibling_rank=Window(
+                RowNumber(),
+                partition_by=[F("parent_id")],
+                order_by=[F("created_at").asc(), F("id").asc()],
+            ))
+            .filter(sibling_rank__lte=settings.COMMENT_INLINE_REPLIES)
+        )
+        if self.wants("author", expanded=True):
+            qs = qs.select_related("author")
+        return qs.order_by("created_at", "id")
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        comments = list(page if page is not None else queryset)
+        self.reply_map = self.build_reply_map(comments)
+
+        serializer = self.get_serializer(comments, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        self.reply_map = self.build_reply_map([instance])
+        return Response(self.get_serializer(instance).data)
+
+    # Reading a thread is open to everyone; CanManageComment only guards edits.
+    @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated])
+    def replies(self, request, pk=None):
+        parent = self.get_object()
+        queryset = Comment.objects.filter(parent=parent)
+        if self.wants("author", expanded=True):
+            queryset = queryset.select_related("author")
+        page = self.paginate_queryset(queryset)
+        self.reply_map = self.build_reply_map(page)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @transaction.atomic
     def perform_create(self, serializer):
         # author injected in serializer.create()
         serializer.save()
+        comment = serializer.instance
+        counters.comment_added(comment)
+        # The parent's replies_count moved too
+        changes.record(changes.Kinds.COMMENT, *filter(None, [comment.parent_id, comment.pk]))
+        changes.record(changes.Kinds.COUNTS, comment.post_id)
+        post = Post.objects.only("comment_count", "root_comment_count").get(pk=comment.post_id)
+        events.publish(
+            "comment-added",
+            {"post": post.pk, "comment": comment.pk, "parent": comment.parent_id,
+             "comments_count": counters.comment_counts(post)},
+        )
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        comment = serializer.save()
+        changes.record(changes.Kinds.COMMENT, comment.pk)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        counters.comment_removed(instance)
+        # Its replies go with it (CASCADE), as they do for clients
+        changes.record(changes.Kinds.COMMENT, instance.pk, deleted=True)
+        if instance.parent_id:
+            changes.record(changes.Kinds.COMMENT, instance.parent_id)
+        changes.record(changes.Kinds.COUNTS, instance.post_id)
+        instance.delete()
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """
+    /api/stats/cache/  -> post fragment cache hit/miss counters (this worker process)
+    """
+    return Response(post_cache.stats())
 
 
 @api_view(["GET"])
@@ -255,4 +847,182 @@ def me(request):
     """
     /api/me/  -> current user's profile
     """
-    return Response(UserSerializer(request.user, context={"request": request}).data)
+    user = request.user
+    # Already loaded by authentication: revalidation costs no query at all
+    stamp = (user.id, user.version, user.changed_at)
+    validators = conditional.Validators(request, stamp, last_modified=user.changed_at)
+    return conditional.not_modified(request, validators) or conditional.set_validators(
+        Response(UserSerializer(user, context={"request": request}).data), validators
+    )
+
+
+def _search_page(request, kind, query):
+    """(paginator, serialized results) for one index, in rank order."""
+    paginator = SearchPagination()
+    rows = paginator.paginate_rows(
+        lambda after, limit: search_index.ranked(kind, query, after=after, limit=limit), request
+    )
+    ids = [pk for pk, _ in rows]
+    context = {"request": request}
+    if kind == "posts":
+        queryset = with_my_reaction(Post.objects.select_related("author").prefetch_related("images"), request.user)
+        serializer_class = PostSerializer
+    else:
+        queryset, serializer_class = User.objects.all(), UserMiniSerializer
+
+    found = queryset.in_bulk(ids)
+    objects = []
+    for pk, rank in rows:
+        if pk in found:  # deleted since the index was read
+            found[pk].rank = rank
+            objects.append(found[pk])
+    paginator.page = objects
+    return paginator, serializer_class(objects, many=True, context=context).data
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def search(request):
+    """
+    /api/search/?q=<text>              -> {"posts": {next, results}, "users": {next, results}}
+    /api/search/?q=<text>&type=posts   -> one list, keyset-paginated (follow `next`)
+    Every word must match as a prefix; best match first (see api/search.py).
+    """
+    query = request.query_params.get("q", "")
+    if not search_index.terms(query):
+        return Response({"detail": "q is required"}, status=400)
+
+    kind = request.query_params.get("type")
+    if kind is not None:
+        if kind not in search_index.INDEXES:
+            return Response({"detail": f"type must be one of {sorted(search_index.INDEXES)}"}, status=400)
+        paginator, results = _search_page(request, kind, query)
+        return paginator.get_paginated_response(results)
+
+    if SearchPagination.cursor_query_param in request.query_params:
+        return Response({"detail": "cursor requires type"}, status=400)
+    sections = {}
+    for kind in search_index.INDEXES:
+        paginator, results = _search_page(request, kind, query)
+        next_link = paginator.get_next_link()
+        if next_link:
+            next_link = replace_query_param(next_link, "type", kind)
+        sections[kind] = {"next": next_link, "results": results}
+    return Response(sections)
+
+
+# Comments are sent flat; clients place them with `parent`
+SYNC_COMMENT_FIELDS = {"id", "post", "author", "parent", "content", "created_at", "replies_count"}
+
+
+def _sync_payload(request, latest):
+    """Current state of every object in `latest` ({(kind, id): deleted}, see api.changes.latest)."""
+    gone, live = defaultdict(set), defaultdict(list)
+    for (kind, pk), deleted in latest.items():
+        if deleted:
+            gone[kind].add(pk)
+        else:
+            live[kind].append(pk)
+
+    posts = with_my_reaction(
+        Post.objects.select_related("author").prefetch_related("images"), request.user
+    ).in_bulk(live[changes.Kinds.POST])
+    # A full post already carries its counters
+    counted = with_my_reaction(
+        Post.objects.only("id", *counters.REACTION_COUNTER_FIELDS, "comment_count", "root_comment_count"), request.user
+    ).in_bulk([pk for pk in live[changes.Kinds.COUNTS] if pk not in posts and pk not in gone[changes.Kinds.POST]])
+    comments = Comment.objects.select_related("author").in_bulk(live[changes.Kinds.COMMENT])
+
+    # Deleted after the changes were logged (their tombstones come with a later token)
+    gone[changes.Kinds.POST] |= {
+        pk for pk in live[changes.Kinds.POST] + live[changes.Kinds.COUNTS] if pk not in posts and pk not in counted
+    }
+    gone[changes.Kinds.COMMENT] |= {pk for pk in live[changes.Kinds.COMMENT] if pk not in comments}
+
+    context = {"request": request}
+    return {
+        "posts": PostSerializer(list(posts.values()), many=True, context=context).data,
+        "comments": CommentSerializer(
+            list(comments.values()), many=True, context=context, fields=SYNC_COMMENT_FIELDS
+        ).data,
+        "counts": [
+            {
+                "post": post.id,
+                "reaction_counts": counters.reaction_counts(post),
+                "comments_count": counters.comment_counts(post),
+                "my_reaction": post.my_reaction_type,
+            }
+            for post in counted.values()
+        ],
+        "deleted": {
+            "posts": sorted(gone[changes.Kinds.POST]),
+            "comments": sorted(gone[changes.Kinds.COMMENT]),
+        },
+    }
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    """
+    /api/sync/?since=<token>  -> what changed since the token (see api/changes.py):
+      {"next": <token>, "reset": false, "has_more": false,
+       "posts": [...], "comments": [...],     current state, rendered as by /api/posts/ and /api/comments/
+       "counts": [{post, reaction_counts, comments_count, my_reaction}],   posts whose counters moved
+       "deleted": {"posts": [ids], "comments": [ids]}}    (a post takes its comments with it)
+    Pass `next` as the following ?since=; with has_more, call again right away.
+    Without ?since=, or with a token older than the log, the answer is empty with
+    reset: true: (re)load the pages as usual, then continue from `next`.
+    """
+    empty = {"posts": [], "comments": [], "counts": [], "deleted": {"posts": [], "comments": []}}
+    raw = request.query_params.get("since")
+    if raw is None:
+        return Response({"next": changes.current(), "reset": True, "has_more": False, **empty})
+    try:
+        since = int(raw)
+    except ValueError:
+        since = -1
+    if since < 0:
+        return Response({"detail": "since must be the `next` token of a previous /api/sync/ response"}, status=400)
+
+    rows, next_token, has_more = changes.read(since, settings.SYNC_MAX_CHANGES)
+    if rows is None:
+        return Response({"next": next_token, "reset": True, "has_more": False, **empty})
+    payload = _sync_payload(request, changes.latest(rows))
+    return Response({"next": next_token, "reset": False, "has_more": has_more, **payload})
+
+
+async def stream(request):
+    """
+    /api/stream/  -> text/event-stream of live feed updates (see api/events.py)
+    Authenticated like the API (Bearer header) or with ?token=<access token>,
+    since EventSource cannot send headers. Resumes after the Last-Event-ID
+    header (or ?last_event_id=). Only served by the ASGI app.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "The event stream is only served by the ASGI app."}, status=501)
+
+    auth = CachedJWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else request.GET.get("token")
+    if not raw_token:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    try:
+        await sync_to_async(auth.get_user)(auth.get_validated_token(raw_token))
+    except AuthenticationFailed:
+        return JsonResponse({"detail": "Given token not valid for any token type"}, status=401)
+
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        last_id = None
+    response = StreamingHttpResponse(
+        events.event_stream(events.get_broker(), last_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # proxies must not buffer the stream
+    return response
+
@@ -3,6 +3,16 @@ ASGI config for school_social_aubrick project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with uvicorn workers for the /api/stream/ event stream, and set
+ASYNC_READ_VIEWS=True to route the hot reads to the async views
+(api/async_views.py):
+
+    gunicorn school_social_aubrick.asgi:application -k uvicorn.workers.UvicornWorker --workers=1
+
+Keep a single worker with the default EVENTS_BROKER (api.events.LocalBroker):
+streams only see events published by their own process. Several workers need
+EVENTS_BROKER=api.events.CacheBroker on a cache they share (Redis, Memcached).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
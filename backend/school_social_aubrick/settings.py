@@ -123,6 +123,29 @@ except Exception:
     }
 
 
+# -----------------------------------------------------------------------------
+# Cache (local memory by default; point CACHE_BACKEND/CACHE_LOCATION at
+# Redis/Memcached to share it between gunicorn workers)
+# -----------------------------------------------------------------------------
+CACHE_BACKEND = env("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache")
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": env("CACHE_LOCATION", "school-social"),
+    },
+    # Authenticated users (api/authentication.py): short TTL, bounded size
+    "users": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": env("CACHE_LOCATION", "school-social-users"),
+        "KEY_PREFIX": "users",
+        "TIMEOUT": int(env("AUTH_USER_CACHE_TTL", "60")),
+    },
+}
+if CACHE_BACKEND.endswith("LocMemCache"):
+    CACHES["users"]["OPTIONS"] = {"MAX_ENTRIES": int(env("AUTH_USER_CACHE_SIZE", "2000"))}
+AUTH_USER_CACHE = "users"
+
+
 # -----------------------------------------------------------------------------
 # Internationalization
 # -----------------------------------------------------------------------------
@@ -140,13 +163,15 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Browser cache lifetime (seconds) for media without a content-hash name (api/media.py)
+MEDIA_CACHE_MAX_AGE = int(env("MEDIA_CACHE_MAX_AGE", "3600"))
 
 # -----------------------------------------------------------------------------
 # DRF & Auth
 # -----------------------------------------------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -164,6 +189,46 @@ AUTH_PASSWORD_VALIDATORS = [
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# -----------------------------------------------------------------------------
+# App
+# -----------------------------------------------------------------------------
+# Deepest reply level nested inline by /api/comments/ (clients may ask for less via ?depth=)
+COMMENT_MAX_DEPTH = int(env("COMMENT_MAX_DEPTH", "8"))
+# Replies inlined per comment; the rest are fetched from /api/comments/{id}/replies/
+COMMENT_INLINE_REPLIES = int(env("COMMENT_INLINE_REPLIES", "3"))
+# Serialized post fragments (api/cache.py): cache alias and TTL in seconds
+POST_FRAGMENT_CACHE = env("POST_FRAGMENT_CACHE", "default")
+POST_FRAGMENT_TTL = int(env("POST_FRAGMENT_TTL", "300"))
+# Most ids accepted by /api/posts/batch/ and /api/users/batch/
+BATCH_MAX_IDS = int(env("BATCH_MAX_IDS", "50"))
+# Most operations accepted by /api/posts/react/bulk/
+BULK_REACTIONS_MAX = int(env("BULK_REACTIONS_MAX", "200"))
+# Most photos accepted by one post creation / upload_image request
+POST_MAX_IMAGES = int(env("POST_MAX_IMAGES", "20"))
+# Serve the feed, post detail, comment list and /api/me/ reads with the async views (api/async_views.py).
+# Turn on only when serving the ASGI app (asgi.py); under WSGI they are slower than the DRF views.
+ASYNC_READ_VIEWS = env("ASYNC_READ_VIEWS", "False").lower() == "true"
+# Live updates over /api/stream/ (api/events.py): broker class, cache alias for CacheBroker,
+# events kept for Last-Event-ID resume, seconds between heartbeats / CacheBroker polls
+EVENTS_BROKER = env("EVENTS_BROKER", "api.events.LocalBroker")
+EVENTS_CACHE = env("EVENTS_CACHE", "default")
+EVENTS_LOG_SIZE = int(env("EVENTS_LOG_SIZE", "1000"))
+EVENTS_HEARTBEAT = float(env("EVENTS_HEARTBEAT", "15"))
+EVENTS_POLL_INTERVAL = float(env("EVENTS_POLL_INTERVAL", "1"))
+# Delta sync over /api/sync/ (api/changes.py): most changes per response, seconds a gap
+# in the change ids may still be a transaction in flight, days kept by `manage.py prune_changes`
+SYNC_MAX_CHANGES = int(env("SYNC_MAX_CHANGES", "500"))
+SYNC_GAP_GRACE = float(env("SYNC_GAP_GRACE", "10"))
+SYNC_RETENTION_DAYS = float(env("SYNC_RETENTION_DAYS", "30"))
+# Renditions generated for every uploaded image (api/images.py): name -> longest side in px
+IMAGE_RENDITIONS = {"thumb": 160, "feed": 720, "full": 1600}
+# Output format of the renditions: WEBP or JPEG
+IMAGE_RENDITION_FORMAT = env("IMAGE_RENDITION_FORMAT", "WEBP").upper()
+# Where renditions are generated (api/jobs.py): "pool" (background processes) or "sync" (in-request)
+IMAGE_PROCESSING = env("IMAGE_PROCESSING", "pool")
+# Worker processes per web worker for IMAGE_PROCESSING="pool"
+IMAGE_WORKERS = int(env("IMAGE_WORKERS", "1"))
+
 # -----------------------------------------------------------------------------
 # CORS
 # -----------------------------------------------------------------------------
@@ -6,7 +6,7 @@ import Header from "@/components/Header";
 import ReactionBar from "@/components/ReactionBar";
 import CommentsThread from "@/components/CommentsThread";
 import styles from "./page.module.css";
-import { api, apiForm, authHeaders, toAbsoluteUrl } from "@/lib/apiClient";
+import { API_BASE, api, apiForm, authHeaders, toAbsoluteUrl } from "@/lib/apiClient";
 
 export default function TimelinePage() {
   const [me, setMe] = useState(null);
@@ -39,17 +39,38 @@ export default function TimelinePage() {
     load();
   }, []);
 
+  // Live updates from /api/stream/: counters change in place, new posts go on top
+  useEffect(() => {
+    const token = localStorage.getItem("token");
+    if (!token) return;
+    const source = new EventSource(
+      `${API_BASE}/stream/?token=${encodeURIComponent(token)}`
+    );
+    source.addEventListener("reaction-count-changed", (e) => {
+      const { post, reaction_counts } = JSON.parse(e.data);
+      setPosts((list) =>
+        list.map((p) => (p.id === post ? { ...p, reaction_counts } : p))
+      );
+    });
+    source.addEventListener("post-created", async (e) => {
+      const { post } = JSON.parse(e.data);
+      const data = await api(`/posts/batch/?ids=${post}`);
+      setPosts((list) =>
+        list.some((p) => p.id === post) ? list : [...data.results, ...list]
+      );
+    });
+    // Missed more than the server keeps: reload the feed
+    source.addEventListener("reset", () => load());
+    return () => source.close();
+  }, []);
+
   async function createPost() {
     if (!content && images.length === 0) return;
-    const post = await api("/posts/", {
-      method: "POST",
-      body: JSON.stringify({ content }),
-    });
-    for (const file of images) {
-      const fd = new FormData();
-      fd.set("image", file);
-      await apiForm(`/posts/${post.id}/upload_image/`, fd);
-    }
+    // One multipart request: the post and all of its photos
+    const fd = new FormData();
+    fd.set("content", content);
+    for (const file of images) fd.append("images", file);
+    await apiForm("/posts/", fd);
     setContent("");
     setImages([]);
     await load();
@@ -414,7 +435,10 @@ export default function TimelinePage() {
               {p.images?.map((img) => (
                 <img
                   key={img.id}
-                  src={toAbsoluteUrl(img.image)}
+                  src={toAbsoluteUrl(img.renditions?.feed || img.image)}
+                  srcSet={img.srcset || undefined}
+                  sizes="(max-width: 720px) 100vw, 720px"
+                  loading="lazy"
                   className="post-image"
                   alt="img"
                 />
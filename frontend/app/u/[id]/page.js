@@ -307,7 +307,10 @@ export default function UserProfilePage() {
                   {p.images?.map((img) => (
                     <img
                       key={img.id}
-                      src={toAbsoluteUrl(img.image)}
+                      src={toAbsoluteUrl(img.renditions?.feed || img.image)}
+                      srcSet={img.srcset || undefined}
+                      sizes="(max-width: 720px) 100vw, 720px"
+                      loading="lazy"
                       className="post-image"
                       alt="img"
                     />
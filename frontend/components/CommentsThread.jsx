@@ -1,11 +1,25 @@
 "use client";
 
 import { useEffect, useState } from "react";
-import { api } from "@/lib/apiClient";
+import { api, apiFollow } from "@/lib/apiClient";
 
 function CommentItem({ c, me, onReply, onDelete }) {
   const [showReply, setShowReply] = useState(false);
   const [text, setText] = useState("");
+  // Only the first replies come inlined; the rest are paged from replies_next
+  const [replies, setReplies] = useState(c.replies || []);
+  const [moreUrl, setMoreUrl] = useState(c.replies_next || null);
+
+  useEffect(() => {
+    setReplies(c.replies || []);
+    setMoreUrl(c.replies_next || null);
+  }, [c]);
+
+  async function loadMoreReplies() {
+    const data = await apiFollow(moreUrl);
+    setReplies((prev) => [...prev, ...data.results]);
+    setMoreUrl(data.next);
+  }
 
   return (
     <div style={{ marginTop: 8 }}>
@@ -65,9 +79,9 @@ function CommentItem({ c, me, onReply, onDelete }) {
           )}
 
           {/* children */}
-          {c.replies?.length > 0 && (
+          {replies.length > 0 && (
             <div style={{ marginLeft: 36 }}>
-              {c.replies.map((r) => (
+              {replies.map((r) => (
                 <CommentItem
                   key={r.id}
                   c={r}
@@ -78,6 +92,13 @@ function CommentItem({ c, me, onReply, onDelete }) {
               ))}
             </div>
           )}
+          {moreUrl && (
+            <div style={{ marginLeft: 36, marginTop: 4 }}>
+              <button className="btn secondary" onClick={loadMoreReplies}>
+                View more replies ({Math.max(c.replies_count - replies.length, 0)})
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -88,17 +109,25 @@ export default function CommentsThread({ postId, me }) {
   const [comments, setComments] = useState([]);
   const [text, setText] = useState("");
   const [loading, setLoading] = useState(true);
+  const [next, setNext] = useState(null);
 
   async function load() {
     setLoading(true);
     try {
       const data = await api(`/comments/?post=${postId}`);
       setComments(data.results || data);
+      setNext(data.next || null);
     } finally {
       setLoading(false);
     }
   }
 
+  async function loadMore() {
+    const data = await apiFollow(next);
+    setComments((prev) => [...prev, ...data.results]);
+    setNext(data.next);
+  }
+
   useEffect(() => {
     load();
   }, [postId]);
@@ -157,6 +186,11 @@ export default function CommentsThread({ postId, me }) {
               />
             ))
         )}
+        {!loading && next && (
+          <button className="btn secondary" style={{ marginTop: 8 }} onClick={loadMore}>
+            Load more comments
+          </button>
+        )}
       </div>
     </div>
   );
@@ -41,3 +41,10 @@ export async function apiForm(path, formData) {
   if (!res.ok) throw new Error(await res.text());
   return res.json();
 }
+
+// Follow an absolute pagination link returned by the API (`next`, `replies_next`)
+export async function apiFollow(url) {
+  const res = await fetch(url, { headers: { ...authHeaders() } });
+  if (!res.ok) throw new Error(await res.text());
+  return res.json();
+}